@@ -0,0 +1,196 @@
+"""Benchmarks for pycaliop
+
+Times the import of the package by a worker that only decodes, and the
+main steps of the processing on synthetic granules (see
+vfm_synthetic) of several sizes, and reports the throughput in profiles
+per second and the peak memory allocated by each step. Results can be
+saved as a baseline, and later runs compared against it:
+
+    python benchmark.py --sizes 100 1000 --save baseline.json
+    python benchmark.py --sizes 100 1000 --compare baseline.json
+
+History:
+   2026-oct-19 First version
+
+"""
+
+import argparse
+import io
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from pycaliop import vfm_synthetic
+from pycaliop import vfm_expand
+from pycaliop import vfm_type
+
+VFMTYPES = ['type', 'typeqa', 'phase', 'phaseqa', 'aerosol', 'cloud',
+            'psc', 'subtype', 'subtypeqa', 'averaging']
+
+
+def measure(func, repeat=3):
+    # best wall time of repeat calls, and peak memory of one call (bytes).
+    # A first call, not timed, warms up imports and caches.
+    func()
+    best = np.inf
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return(best, peak)
+
+
+def stages(vfm_file, render=True):
+    # name and function of each benchmarked step, for one granule
+    data = vfm_file['Data']
+    block = vfm_expand.vfm_expand(data)
+    xs = [vfm_file['Latitude'], vfm_file['Longitude']]
+    alt = vfm_file['Altitude']
+
+    out = [('expand', lambda: vfm_expand.vfm_expand(data))]
+    for tag in VFMTYPES:
+        out.append(('decode_' + tag, lambda tag=tag: vfm_type.vfm_type(block, tag)))
+
+    def pipeline():
+        b = vfm_expand.vfm_expand(data)
+        for tag in VFMTYPES:
+            vfm_type.vfm_type(b, tag)
+    out.append(('pipeline', pipeline))
+
+    out.append(('colormap', _colormaps))
+
+    if render:
+        import matplotlib
+        matplotlib.use('Agg')
+        import os
+        import tempfile
+        import matplotlib.pyplot as plt
+        from pycaliop import vfm_plot
+        from pycaliop import vfm_png
+
+        vfm = vfm_type.vfm_type(block, 'type')
+
+        def plot():
+            fig = vfm_plot.vfm_plot(vfm, xs, alt)[0]
+            fig.savefig(io.BytesIO(), format='png')
+            plt.close(fig)
+        out.append(('render', plot))
+
+        tmp = os.path.join(tempfile.mkdtemp(), 'benchmark.png')
+        def png():
+            vfm_png.vfm_png(tmp, vfm, size=[400, 200], y=alt)
+        out.append(('png', png))
+
+    return(out)
+
+
+def _colormaps():
+    # builds all colormaps from scratch
+    from pycaliop import CreateColorMap
+    CreateColorMap._COLORS.clear()
+    CreateColorMap._CMAPS.clear()
+    CreateColorMap._LUTS.clear()
+    for name in ['Feature Type', 'Feature Type QA', 'Ice/Water Phase',
+                 'Ice/Water Phase QA', 'Aerosol Sub-Type', 'Cloud Sub-Type',
+                 'PSC Sub-Type', 'Sub-Type', 'Sub-Type QA',
+                 'Averaging Required for Detection']:
+        CreateColorMap.CreateColorMap(name)
+        CreateColorMap.ColorMapLUT(name)
+
+
+def import_time(repeat=3):
+    """Best time (s) to start a worker that only decodes, i.e. to import
+    pycaliop with numpy and the decode modules, measured in fresh
+    processes. Also tells whether matplotlib was imported by the way."""
+    import subprocess
+    code = ('import sys, time; t0 = time.perf_counter(); import pycaliop; '
+            'from pycaliop import vfm_expand, vfm_type; '
+            'print(time.perf_counter() - t0, "matplotlib" in sys.modules)')
+    best = np.inf
+    for i in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code], check=True,
+                             capture_output=True, text=True).stdout.split()
+        best = min(best, float(out[0]))
+    return(best, out[1] == 'True')
+
+
+def run(sizes=[100, 1000], repeat=3, render=True):
+    """Runs all benchmarks, returns {stage: {ntimes: result}}"""
+
+    results = {}
+    [best, mpl] = import_time(repeat=repeat)
+    results['import'] = {'0': {'time':best, 'matplotlib':mpl}}
+    print('%-18s %6s      %10.4f s %s' %('import', '', best,
+                                        '(imports matplotlib)' if mpl else ''))
+
+    for ntimes in sizes:
+        vfm_file = vfm_synthetic.vfm_synthetic(ntimes)
+        nprof = 15*ntimes
+        for name, func in stages(vfm_file, render=render):
+            [best, peak] = measure(func, repeat=repeat)
+            results.setdefault(name, {})[str(ntimes)] = {
+                'time':best, 'profiles_per_s':nprof/best, 'peak_mb':peak/2**20}
+            print('%-18s %6d rows %10.4f s %12.0f prof/s %9.1f MB'
+                  %(name, ntimes, best, nprof/best, peak/2**20))
+
+    return(results)
+
+
+def compare(results, baseline, tol=0.2):
+    """Prints the speed of results relative to baseline, returns the
+    number of benchmarks slower by more than tol (fraction)"""
+
+    slower = 0
+    for name, res in results.items():
+        for ntimes, r in res.items():
+            if ntimes not in baseline.get(name, {}):
+                continue
+            ratio = r['time'] / baseline[name][ntimes]['time']
+            flag = ''
+            if ratio > 1 + tol:
+                flag = '  SLOWER'
+                slower += 1
+            elif ratio < 1 - tol:
+                flag = '  faster'
+            print('%-18s %6s rows %6.2fx baseline time%s' %(name, ntimes, ratio, flag))
+
+    return(slower)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='pycaliop benchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000],
+                        help='granule sizes, in VFM rows (15 profiles each)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-render', action='store_true',
+                        help='skip the plotting benchmarks')
+    parser.add_argument('--save', help='save results as a JSON baseline')
+    parser.add_argument('--compare', help='compare with a JSON baseline')
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, repeat=args.repeat, render=not args.no_render)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline) > 0:
+            return(1)
+
+    return(0)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
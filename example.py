@@ -15,15 +15,10 @@ import matplotlib.pyplot as plt
 #import matplotlib.dates as mdates
 #import numpy as np
 
-import imp
-import vfm_type
-import vfm_expand
-import vfm_plot
-import map_plot
-imp.reload(vfm_type)
-imp.reload(vfm_expand)
-imp.reload(vfm_plot)
-imp.reload(map_plot)
+from pycaliop import vfm_type
+from pycaliop import vfm_expand
+from pycaliop import vfm_plot
+from pycaliop import map_plot
 
 plt.ion()
 plt.interactive(True)
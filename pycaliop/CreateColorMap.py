@@ -1,4 +1,11 @@
-def CreateColorMap(ColorMap, NumColors = 0):
+# Colors, colormaps and lookup tables already built, see CreateColorMap()
+# and ColorMapLUT()
+_COLORS = {}
+_CMAPS = {}
+_LUTS = {}
+
+
+def CreateColorMap(ColorMap, NumColors = 0, version = 4):
     """
     CREATECOLORMAP   Creates a colormap 
        [red,grn,blu] = CREATECOLORMAP(ColorMap) takes a ColorMap name (string)
@@ -27,8 +34,23 @@ def CreateColorMap(ColorMap, NumColors = 0):
           'Rainbow' or 'default'
           'BlackWhite'
           'BlackGold'
+
+       The first color of the linear colormaps is black and the last one
+       is white.
+
+       [cmap] = CREATECOLORMAP(ColorMap, version=3) returns the colors
+       used for the V3 products (see CreateColorMap_v3.py) rather than
+       those of V4.
+
+       Each colormap is built only once and kept in a registry, later
+       calls return the same ListedColormap (so do not modify it, use
+       cmap.copy() instead). See also ColorMapLUT().
     
        History:
+          2026-oct-19 Colormaps are cached. Added version. Linear
+                      colormaps use a vectorized HSVtoRGB, and are
+                      now returned.
+
           2021-may-26 Translated from Matlab to Python
     
           2021-apr-09 Added names for all colormaps associated with standard
@@ -41,37 +63,108 @@ def CreateColorMap(ColorMap, NumColors = 0):
     
     """
     
+    import matplotlib as mpl
+
+    key = (ColorMap, NumColors, version)
+    if key not in _CMAPS:
+        _CMAPS[key] = mpl.colors.ListedColormap(ColorMapColors(ColorMap, NumColors, version))
+
+    return(_CMAPS[key])
+
+
+def ColorMapColors(ColorMap, NumColors = 0, version = 4):
+    """
+    COLORMAPCOLORS   Colors of a colormap
+       [colors] = COLORMAPCOLORS(ColorMap, NumColors, version) returns the
+       colors of the colormap returned by CreateColorMap(), as a float
+       array of size ncolors x 3 (red, green, blue, 0-1). It does not need
+       matplotlib, except for the V3 colormaps. The array is cached, do
+       not modify it.
+
+       History:
+          2026-oct-19 First version
+
+    """
+
+    key = (ColorMap, NumColors, version)
+    if key not in _COLORS:
+        if (version == 3) & (NumColors == 0):
+            import numpy as np
+            from . import CreateColorMap_v3
+            colors = np.array(CreateColorMap_v3.CreateColorMap(ColorMap).colors)
+        else:
+            colors = _BuildColorMap(ColorMap, NumColors)
+        colors.flags.writeable = False
+        _COLORS[key] = colors
+
+    return(_COLORS[key])
+
+
+def ColorMapLUT(ColorMap, vmin = None, vmax = None, NumColors = 0, version = 4):
+    """
+    COLORMAPLUT   Lookup table of a colormap
+       [lut] = COLORMAPLUT(ColorMap) returns the colors of the colormap
+       returned by CreateColorMap(ColorMap) as an uint8 array of size
+       ncolors x 3 (red, green, blue), to be used with np.take.
+
+       [lut] = COLORMAPLUT(ColorMap, vmin, vmax) returns instead one color
+       for each integer between vmin and vmax, the same pcolormesh would
+       use with limits vmin-0.5 and vmax+0.5 (see vfm_plot).
+
+       NumColors and version are passed to CreateColorMap(). Tables are
+       cached, do not modify them. As ColorMapColors(), it does not need
+       matplotlib.
+
+       History:
+          2026-oct-19 First version
+
+    """
+
+    import numpy as np
+
+    key = (ColorMap, vmin, vmax, NumColors, version)
+    if key not in _LUTS:
+        colors = ColorMapColors(ColorMap, NumColors, version)
+        if vmin is not None:
+            # same as a ListedColormap with a Normalize(vmin-0.5, vmax+0.5)
+            ncol = colors.shape[0]
+            x = (np.arange(vmin, vmax+1) - vmin + 0.5) / (vmax - vmin + 1)
+            colors = colors[np.minimum(np.int64(x*ncol), ncol-1)]
+        lut = np.uint8(np.round(255*colors))
+        lut.flags.writeable = False
+        _LUTS[key] = lut
+
+    return(_LUTS[key])
+
+
+def _BuildColorMap(ColorMap, NumColors = 0):
+    # colors of the colormap, see CreateColorMap()
     import numpy as np
     import sys
-    import matplotlib as mpl
     
     if (ColorMap == 'Feature Type'):
         red = np.array([255,   0,   0, 255, 250,   0, 192,   0])/255
         grn = np.array([255,  38, 220, 160, 255, 255, 192,   0])/255 
         blu = np.array([255, 255, 255,   0,   0, 110, 192,   0])/255 
-        cmap = mpl.colors.ListedColormap(np.array([red, grn, blu]).transpose())
-        return(cmap)
+        return(np.array([red, grn, blu]).transpose())
 
     if (ColorMap == 'Feature Type QA'):
         red = np.array([ 230, 0, 230, 255,    0, 255])/255
         grn = np.array([ 230, 0,   0, 255,  200,   0])/255
         blu = np.array([ 230, 0,   0,   0,    0, 255])/255 
-        cmap = mpl.colors.ListedColormap(np.array([red, grn, blu]).transpose())
-        return(cmap)
+        return(np.array([red, grn, blu]).transpose())
 
     if (ColorMap == 'Ice/Water Phase'):
         red = np.array([ 192, 255,  255,   0, 169])/255
         grn = np.array([ 255,   0,  255,   0, 169])/255
         blu = np.array([ 168,   0,  255, 255, 169])/255 
-        cmap = mpl.colors.ListedColormap(np.array([red, grn, blu]).transpose())
-        return(cmap)
+        return(np.array([red, grn, blu]).transpose())
 
     if (ColorMap == 'Ice/Water Phase QA'):
         red = np.array([ 192, 255,  255,   0, 169])/255
         grn = np.array([ 255,   0,  255,   0, 169])/255
         blu = np.array([ 168,   0,  255, 255, 169])/255 
-        cmap = mpl.colors.ListedColormap(np.array([red, grn, blu]).transpose())
-        return(cmap)
+        return(np.array([red, grn, blu]).transpose())
 
     if (ColorMap == 'Aerosol Sub-Type'):
         #3.30
@@ -82,47 +175,40 @@ def CreateColorMap(ColorMap, NumColors = 0):
         red = np.array([ 198, 255,   0, 250, 255,   0, 153, 0,   0])/255
         grn = np.array([ 198,   0,   0, 255, 179, 166,  76, 0, 142])/255 
         blu = np.array([ 198, 255, 255,   0,   0,   0,   0, 0, 194])/255 
-        cmap = mpl.colors.ListedColormap(np.array([red, grn, blu]).transpose())
-        return(cmap)
+        return(np.array([red, grn, blu]).transpose())
                                          
     if (ColorMap == 'Cloud Sub-Type'):
         red = np.array([  0, 255,   0, 174, 255, 250,   0, 192,   0])/255
         grn = np.array([ 38,   0, 220,  87, 160, 255, 255, 192,   0])/255 
         blu = np.array([255,   0, 255,   0,   0,   0, 110, 192,   0])/255 
-        cmap = mpl.colors.ListedColormap(np.array([red, grn, blu]).transpose())
-        return(cmap)
+        return(np.array([red, grn, blu]).transpose())
 
     if (ColorMap == 'PSC Sub-Type'):
         red = np.array([ 198, 255, 255, 138,  81,  0])/255
         grn = np.array([ 198,   0, 255, 138,  81,  0])/255 
         blu = np.array([ 198, 255, 255, 138,  81,  0])/255 
-        cmap = mpl.colors.ListedColormap(np.array([red, grn, blu]).transpose())
-        return(cmap)
+        return(np.array([red, grn, blu]).transpose())
 
     if (ColorMap == 'Sub-Type'):
         red = np.array([ 198, 255,   0, 250, 255,   0, 153, 0,   0])/255
         grn = np.array([ 198,   0,   0, 255, 179, 166,  76, 0, 142])/255 
         blu = np.array([ 198, 255, 255,   0,   0,   0,   0, 0, 194])/255 
-        cmap = mpl.colors.ListedColormap(np.array([red, grn, blu]).transpose())
-        return(cmap)
+        return(np.array([red, grn, blu]).transpose())
                                          
     if (ColorMap == 'Sub-Type QA'):
         red = np.array([ 198, 255,   0])/255
         grn = np.array([ 198,   0, 166])/255
         blu = np.array([ 198,   0,   0])/255 
-        cmap = mpl.colors.ListedColormap(np.array([red, grn, blu]).transpose())
-        return(cmap)
+        return(np.array([red, grn, blu]).transpose())
 
     if (ColorMap == 'Averaging Required for Detection'):
         red = np.array([ 202, 244,   0, 255,   0,   0])/255
         grn = np.array([ 202, 104, 255, 255, 125,   0])/255 
         blu = np.array([ 255,  12,   0,   0,  63, 128])/255 
-        cmap = mpl.colors.ListedColormap(np.array([red, grn, blu]).transpose())
-        return(cmap)
+        return(np.array([red, grn, blu]).transpose())
 
     if NumColors == 0:
         sys.exit('Advanced colormaps require the NumColors as a parameter.')
-        return(null)
 
     if (ColorMap == 'Rainbow') | (ColorMap == 'default'):
         print('Using Rainbow colormap')
@@ -138,90 +224,73 @@ def CreateColorMap(ColorMap, NumColors = 0):
         final_hsv = [39,  730, 1000]
     else:
         sys.exit(['Unknown ColorMap. Check input', ColorMap])
-        return(cmap)
 
     Dhue = (final_hsv[0] - start_hsv[0])/NumColors
     Dsat = (final_hsv[1] - start_hsv[1])/NumColors
     Dval = (final_hsv[2] - start_hsv[2])/NumColors
 
-    hue = start_hsv[0]
-    sat = start_hsv[1]
-    val = start_hsv[2]
-
     if (ColorMap == 'Rainbow') | (ColorMap == 'default'):
-        R = np.zeros((NumColors,1))
-        G = np.zeros((NumColors,1))
-        B = np.zeros((NumColors,1))
+        # The hue step is larger in the blue and green regions, so the
+        # hues are found one by one. This is cheap, and colors are
+        # computed for all of them at once.
         bluStep = 4
         grnStep = 3.2
-        i = 0
-        while (hue >= final_hsv[0]):
-            [R[i], G[i], B[i]] = HSVtoRGB(round(hue),round(sat),round(val))
-            # ColorValue(i)=red*65536+grn*256+blu
-            if (hue <= 254) & (hue >= 222):
-                hue = hue + Dhue*bluStep
-            elif (hue <= 140) & (hue >= 85):
-                hue = hue + Dhue*grnStep
+        hue = [start_hsv[0]]
+        while (len(hue) < NumColors):
+            h = hue[-1]
+            if (h <= 254) & (h >= 222):
+                h = h + Dhue*bluStep
+            elif (h <= 140) & (h >= 85):
+                h = h + Dhue*grnStep
             else:
-                hue = hue + Dhue
-            i = i + 1
-
-        # Copy color info to new array of correct size 
-        red = np.ones((i+1,1)) * R[0:i]
-        grn = np.ones((i+1,1)) * G[0:i]
-        blu = np.ones((i+1,1)) * B[0:i]
+                h = h + Dhue
+            if (h < final_hsv[0]):
+                break
+            hue.append(h)
+        hue = np.array(hue)
+        sat = np.full(hue.shape, start_hsv[1])
+        val = np.full(hue.shape, start_hsv[2])
 
     else:
-        red = np.zeros((NumColors,1))
-        grn = np.zeros((NumColors,1))
-        blu = np.zeros((NumColors,1))
-        for i in range(NumColors):
-            [red[i],grn[i],blu[i]] = HSVtoRGB(round(hue),round(sat),round(val))
-            # ColorValue(i)=red*65536+grn*256+blu
-            hue = hue + Dhue
-            sat = sat + Dsat
-            val = val + Dval
-            if (hue < 0.0):
-                hue = hue + 360
-            if (hue > 360.0):
-                hue = hue - 360
-            # Should use a better convention below because
-            # there would be a discontinuity in the colormap
-            # if we jump from ~0 to ~1000.
-            if (sat < 0.0):
-                sat = sat + 1000
-            if (sat > 1000):
-                sat = sat - 1000
-            if (val < 0.0):
-                val = val + 1000
-            if (val > 1000.0):
-                val = val + 1000
+        step = np.arange(NumColors)
+        hue = np.mod(start_hsv[0] + step*Dhue, 360)
+        # Should use a better convention below because
+        # there would be a discontinuity in the colormap
+        # if we jump from ~0 to ~1000.
+        sat = np.mod(start_hsv[1] + step*Dsat, 1000)
+        val = np.mod(start_hsv[2] + step*Dval, 1000)
+
+    [red, grn, blu] = HSVtoRGB(np.round(hue), np.round(sat), np.round(val))
 
     red[0] = 0
     grn[0] = 0
     blu[0] = 0
 
-    red[i] = 1 
-    grn[i] = 1
-    blu[i] = 1
+    red[-1] = 1 
+    grn[-1] = 1
+    blu[-1] = 1
+
+    return(np.array([red, grn, blu]).transpose())
 
 
 def HSVtoRGB( h, s, v):
+    """
+    HSVTORGB   Converts HSV colors to RGB
+       [r,g,b] = HSVTORGB(h, s, v) converts hue (0-360), saturation and
+       value (0-1000) to red, green and blue (0-1). h, s and v can be
+       numbers or arrays of the same shape.
+
+    """
     import numpy as np
     # int i, f
     # int p, q, t
     # s = (s * 0xff) / 1000
     # v = (v * 0xff) / 1000
     ff = 255
-    s = (s * ff) / 1000
-    v = (v * ff) / 1000
-    if (h == 360):
-        h = 0
-    if (s == 0):
-        h = 0
-        r = v
-        g = v
-        b = v
+    h = np.where(np.asarray(h) == 360, 0, h)
+    s = (np.asarray(s) * ff) / 1000
+    v = (np.asarray(v) * ff) / 1000
+    h = np.where(s == 0, 0, h)
     i = np.floor(h / 60)
     f = np.mod(h,60)
     # p = v * (0xff - s) / 0xff
@@ -230,34 +299,10 @@ def HSVtoRGB( h, s, v):
     p = v * (ff - s) / ff
     q = v * (ff - s * f / 60) / ff
     t = v * (ff - s * (60 - f) / 60) / ff
-    if i == 0:
-      r = v
-      g = t
-      b = p 
-    elif i == 1:
-      r = q
-      g = v
-      b = p 
-    elif i == 2:
-      r = p
-      g = v
-      b = t 
-    elif i == 3: 
-      r = p
-      g = q
-      b = v
-    elif i == 4:
-      r = t
-      g = p
-      b = v
-    elif i == 5: 
-      r = v
-      g = p
-      b = q
-    else:
-      r = ff
-      g = ff
-      b = ff
+    case = [i == 0, i == 1, i == 2, i == 3, i == 4, i == 5]
+    r = np.select(case, [v, q, p, p, t, v], ff)
+    g = np.select(case, [t, v, v, q, p, p], ff)
+    b = np.select(case, [p, p, t, v, v, q], ff)
 
     r = r/ff
     g = g/ff
@@ -0,0 +1,49 @@
+"""pyCALIOP, read, process and plot CALIOP data
+
+Each module holds a function of the same name, e.g.
+
+    from pycaliop import vfm_read, vfm_expand, vfm_type
+    vfm_file = vfm_read.vfm_read(filen)
+    vfmblock = vfm_expand.vfm_expand(vfm_file['Data'])
+    vfmflag = vfm_type.vfm_type(vfmblock, 'type')
+
+The modules needed to read and decode the VFM are imported with the
+package. The plotting modules (vfm_plot, map_plot, CreateColorMap, ...)
+bring matplotlib and cartopy with them, and are only imported when
+first used, so processes that only decode the data start quickly.
+
+History:
+   2026-oct-19 First version, the modules were loose files before
+
+"""
+
+import importlib
+
+__version__ = '0.1.0'
+
+from . import vfm_expand
+from . import vfm_read
+from . import vfm_stats
+from . import vfm_type
+from . import vfm_type_v3
+
+# imported on first use
+_LAZY = ['CreateColorMap', 'CreateColorMap_v3', 'map_plot', 'track_simplify',
+         'vfm_cache', 'vfm_colocate', 'vfm_column', 'vfm_compare',
+         'vfm_dataset', 'vfm_decimate', 'vfm_levels', 'vfm_lru', 'vfm_mmap',
+         'vfm_pipeline', 'vfm_plot', 'vfm_png', 'vfm_quicklook', 'vfm_shm',
+         'vfm_sparse', 'vfm_stitch', 'vfm_synthetic', 'vfm_tiles']
+
+__all__ = ['vfm_expand', 'vfm_read', 'vfm_stats', 'vfm_type', 'vfm_type_v3'] + _LAZY
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        module = importlib.import_module('.' + name, __name__)
+        globals()[name] = module
+        return(module)
+    raise AttributeError('module ' + repr(__name__) + ' has no attribute ' + repr(name))
+
+
+def __dir__():
+    return(sorted(set(globals()) | set(_LAZY)))
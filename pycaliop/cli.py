@@ -0,0 +1,604 @@
+"""Command line interface of pycaliop
+
+    python -m pycaliop decode    'data/*.hdf' -o out --fields type phase
+    python -m pycaliop quicklook 'data/*.hdf' -o out --workers 8
+    python -m pycaliop grid      'data/*.hdf' -o out --res 2 --region -30 30 -180 180
+    python -m pycaliop catalog   'data/*.hdf' -o out
+
+Every command takes file names or globs, an output directory (-o),
+--workers, --fields, and a region (--region S N W E) and time (--start,
+--end) filter. Granules are processed independently, in a pool of
+worker processes. Outputs are written to a temporary name and renamed
+when complete, so a command that is interrupted can be run again and
+skips the granules that are already done, including those without any
+profile in the region and period (listed in <command>_empty.txt). The
+.npz outputs keep the options they were made with ('Options'), and a
+granule is only skipped if they are those of the current run: decode
+and grid with other fields, resolution, region or period are done
+again, and the grid totals only add the grids of the current options. Each
+run adds to a summary (<command>_summary.json in the output directory)
+with the number of granules done, skipped and failed, the throughput
+and the time spent in each stage (see vfm_stats).
+
+History:
+   2026-oct-19 First version
+
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+VFMTYPES = ['type', 'typeqa', 'phase', 'phaseqa', 'aerosol', 'cloud',
+            'psc', 'subtype', 'subtypeqa', 'averaging']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='pycaliop',
+                                     description='Batch processing of CALIPSO VFM files')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('files', nargs='+', help='VFM files, or globs (quoted)')
+    common.add_argument('-o', '--outdir', default='.', help='output directory')
+    common.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: number of cpus)')
+    common.add_argument('--fields', nargs='+', default=VFMTYPES, choices=VFMTYPES,
+                        metavar='FIELD', help='feature flags (default: all)')
+    common.add_argument('--region', type=float, nargs=4, metavar=('S', 'N', 'W', 'E'),
+                        help='keep profiles within these latitudes and longitudes')
+    common.add_argument('--start', help='keep profiles after this time (e.g. 2013-05-06T12:00)')
+    common.add_argument('--end', help='keep profiles before this time')
+    common.add_argument('--overwrite', action='store_true',
+                        help='process again granules already done')
+
+    p = sub.add_parser('decode', parents=[common],
+                       help='decode feature flags to one .npz per granule')
+    p.add_argument('--compress', action='store_true', help='compress the .npz files')
+
+    p = sub.add_parser('quicklook', parents=[common], help='save quicklook images')
+    p.add_argument('--no-map', action='store_true', help='do not plot the track')
+
+    p = sub.add_parser('grid', parents=[common],
+                       help='count feature flag values on a lat/lon grid')
+    p.add_argument('--res', type=float, default=1., help='grid resolution (degrees)')
+
+    sub.add_parser('catalog', parents=[common],
+                   help='list the time and coordinates of the granules')
+
+    args = parser.parse_args(argv)
+
+    files = []
+    for pattern in args.files:
+        files.extend(sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern])
+    os.makedirs(args.outdir, exist_ok=True)
+
+    opts = {'fields':args.fields, 'region':args.region,
+            'period':_period(args.start, args.end), 'overwrite':args.overwrite}
+    if args.command == 'decode':
+        opts['compress'] = args.compress
+    elif args.command == 'quicklook':
+        opts['map'] = not args.no_map
+    elif args.command == 'grid':
+        opts['res'] = args.res
+    elif args.command == 'catalog':
+        # a single table, resumed from the granules already listed
+        opts['done'] = set(_catalog_read(args.outdir))
+
+    summary = run(args.command, files, args.outdir, opts, workers=args.workers)
+
+    if args.command == 'grid':
+        grid_total(args.outdir, opts)
+    elif args.command == 'catalog':
+        _catalog_write(args.outdir, summary['results'])
+
+    print('%s: %d done (%d empty), %d skipped, %d failed, %d profiles in %.1f s '
+          '(%.2f granules/s, %.0f profiles/s)'
+          %(args.command, summary['done'], summary['empty'], summary['skipped'],
+            len(summary['failed']),
+            summary['profiles'], summary['seconds'], summary['files_per_s'],
+            summary['profiles_per_s']))
+
+    return(1 if summary['failed'] else 0)
+
+
+def run(command, files, outdir, opts, workers=None):
+    """Runs command on each file, in workers processes, and returns the
+    run summary (also saved as <command>_summary.json in outdir)"""
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    t0 = time.perf_counter()
+    results = {}
+    # granules known to have nothing in the region and period
+    empty = set(_empty_read(outdir, command, opts))
+    if not opts['overwrite']:
+        for filen in [f for f in files if f in empty]:
+            results[filen] = {'status':'skipped', 'profiles':0, 'stages':{}, 'error':None}
+    todo = [f for f in files if f not in results]
+    # plotting needs the Agg backend in the workers
+    init = None
+    if command == 'quicklook':
+        from . import vfm_quicklook
+        init = vfm_quicklook._init_worker
+    if workers == 1:
+        if init is not None:
+            init()
+        for filen in todo:
+            results[filen] = _job(command, filen, outdir, opts)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init) as pool:
+            jobs = {filen: pool.submit(_job, command, filen, outdir, opts) for filen in todo}
+            for filen, job in jobs.items():
+                results[filen] = job.result()
+    seconds = time.perf_counter() - t0
+
+    summary = {'command':command, 'outdir':outdir, 'files':len(files),
+               'done':0, 'skipped':0, 'empty':0, 'failed':[], 'profiles':0,
+               'seconds':seconds, 'stages':{}}
+    for filen, res in results.items():
+        if res['status'] == 'failed':
+            summary['failed'].append([filen, res['error']])
+            print('Error: could not process ' + filen + ': ' + res['error'])
+        else:
+            summary[res['status']] += 1
+        if res.get('empty'):
+            summary['empty'] += 1
+        summary['profiles'] += res['profiles']
+        for name, s in res['stages'].items():
+            total = summary['stages'].setdefault(name, dict.fromkeys(s, 0))
+            for k in s:
+                total[k] += s[k]
+    summary['files_per_s'] = summary['done'] / seconds
+    summary['profiles_per_s'] = summary['profiles'] / seconds
+
+    _empty_write(outdir, command, opts, [f for f, res in results.items() if res.get('empty')])
+
+    # added to the summary of the previous runs
+    filen = os.path.join(outdir, command + '_summary.json')
+    total = summary
+    if os.path.exists(filen):
+        with open(filen) as f:
+            total = _summary_merge(json.load(f), summary)
+    with open(filen + '.tmp', 'w') as f:
+        json.dump(total, f, indent=1)
+    os.replace(filen + '.tmp', filen)
+
+    summary['results'] = results
+    return(summary)
+
+
+def _summary_merge(prev, summary):
+    # summary of all runs, from that of the previous ones and of this one
+    total = dict(summary)
+    total['runs'] = prev.get('runs', 1) + 1
+    for k in ['done', 'empty', 'profiles', 'seconds']:
+        total[k] = prev.get(k, 0) + summary[k]
+    # failures of the previous runs, unless the granule was done since
+    again = set(f for f, e in summary['failed'])
+    total['failed'] = [f for f in prev.get('failed', []) if f[0] not in again] + summary['failed']
+    total['stages'] = {k: dict(v) for k, v in prev.get('stages', {}).items()}
+    for name, s in summary['stages'].items():
+        t = total['stages'].setdefault(name, dict.fromkeys(s, 0))
+        for k in s:
+            t[k] = t.get(k, 0) + s[k]
+    total['files_per_s'] = total['done'] / max(total['seconds'], 1e-9)
+    total['profiles_per_s'] = total['profiles'] / max(total['seconds'], 1e-9)
+    return(total)
+
+
+def _job(command, filen, outdir, opts):
+    # one granule, failures are reported but do not stop the run
+    from . import vfm_stats
+
+    res = {'status':'done', 'profiles':0, 'stages':{}, 'error':None}
+    try:
+        with vfm_stats.collect() as stats:
+            res.update(COMMANDS[command](filen, outdir, opts))
+        res['stages'] = stats
+    except (Exception, SystemExit) as err:
+        res.update(status='failed', error=repr(err))
+    return(res)
+
+
+def decode(filen, outdir, opts):
+    """Decodes the feature flags of filen, saved to outdir/<granule>.npz
+    with the coordinates of the profiles kept"""
+
+    import numpy as np
+
+    out = output_file(outdir, filen, '.npz')
+    if _done(out, 'decode', opts):
+        return({'status':'skipped'})
+
+    vfm_file = _read(filen, opts)
+    if vfm_file is None:
+        return({'empty':True})
+
+    vfm_type = vfm_decoder(vfm_file)
+    data = {k: vfm_file[k] for k in ['Latitude', 'Longitude', 'Time', 'Altitude']}
+    data['Options'] = np.array(_options('decode', opts))
+    for tag in opts['fields']:
+        # all flags are between -1 and 7
+        data[tag] = np.int8(vfm_type.vfm_type(vfm_file['Block'], tag)['Data'])
+
+    save = np.savez_compressed if opts['compress'] else np.savez
+    with open(out + '.tmp', 'wb') as f:
+        save(f, **data)
+    os.replace(out + '.tmp', out)
+
+    return({'profiles':len(vfm_file['Latitude'])})
+
+
+def quicklook(filen, outdir, opts):
+    """Saves the quicklook images of filen (see vfm_quicklook)"""
+
+    from . import vfm_quicklook
+
+    base = output_file(outdir, filen, '')
+    images = [base + '_' + tag + '.png' for tag in opts['fields']]
+    if opts['map']:
+        images.append(base + '_map.png')
+    if all(os.path.exists(f) for f in images) and not opts['overwrite']:
+        return({'status':'skipped'})
+
+    # only the whole granule can be plotted, keep it if any profile is in
+    entry = catalog_entry(filen)
+    if not _overlaps(entry, opts['region'], opts['period']):
+        return({'empty':True})
+
+    vfm_quicklook.vfm_quicklook(filen, outdir=outdir, fields=opts['fields'], map=opts['map'])
+    return({'profiles':entry['profiles']})
+
+
+def grid(filen, outdir, opts):
+    """Counts, for each feature flag, the pixels of each value in cells of
+    res degrees, saved to outdir/grid/<granule>.npz"""
+
+    import numpy as np
+
+    out = output_file(os.path.join(outdir, 'grid'), filen, '.npz')
+    if _done(out, 'grid', opts):
+        return({'status':'skipped'})
+
+    vfm_file = _read(filen, opts)
+    if vfm_file is None:
+        return({'empty':True})
+
+    [lat_edges, lon_edges] = grid_edges(opts['res'], opts['region'])
+    vfm_type = vfm_decoder(vfm_file)
+    vfms = {tag: vfm_type.vfm_type(vfm_file['Block'], tag) for tag in opts['fields']}
+    data = grid_counts(vfm_file['Latitude'], vfm_file['Longitude'], vfms,
+                       lat_edges, lon_edges)
+    data['Version'] = vfm_file['Version']
+    data['Options'] = np.array(_options('grid', opts))
+
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out + '.tmp', 'wb') as f:
+        np.savez(f, **data)
+    os.replace(out + '.tmp', out)
+
+    return({'profiles':len(vfm_file['Latitude'])})
+
+
+def grid_counts(lat, lon, vfms, lat_edges, lon_edges, profile=None):
+    """Number of profiles ('Profiles', lat x lon) and of pixels of each
+    value of the decoded flags vfms ({field: vfm_type output}, value x
+    lat x lon) in the cells of the grid, with the edges 'Lat' and 'Lon'.
+    Profiles outside the grid are counted in its edge cells. For the
+    flags of a table of vfm_sparse, 'Data' has one value per pixel and
+    profile is the profile of each pixel (see vfm_sparse_grid)"""
+
+    import numpy as np
+
+    nlat, nlon = len(lat_edges) - 1, len(lon_edges) - 1
+    ilat = np.clip(np.digitize(lat, lat_edges) - 1, 0, nlat - 1)
+    # east of the dateline when the region crosses it
+    lon = np.where(lon < lon_edges[0], lon + 360., lon)
+    ilon = np.clip(np.digitize(lon, lon_edges) - 1, 0, nlon - 1)
+    cell = ilat*nlon + ilon
+
+    data = {'Lat':lat_edges, 'Lon':lon_edges,
+            'Profiles':np.bincount(cell, minlength=nlat*nlon).reshape(nlat, nlon)}
+    for tag, vfm in vfms.items():
+        nval = len(vfm['ByteTxt'])
+        val = np.int64(vfm['Data']) - vfm['Vmin']
+        # values out of the range of the field (spare codes) are not counted
+        valid = (val >= 0) & (val < nval)
+        # value x cell of each pixel, the same cell for all levels
+        ind = val*(nlat*nlon) + (cell[None, :] if profile is None else cell[profile])
+        data[tag] = np.bincount(ind[valid], minlength=nval*nlat*nlon).reshape(nval, nlat, nlon)
+
+    return(data)
+
+
+def grid_total(outdir, opts):
+    """Adds the grids of all granules in outdir/grid made with the
+    options opts (fields, res, region and period), for each product
+    version (their values differ), see grid_add and grid_save"""
+
+    import numpy as np
+
+    files = sorted(glob.glob(os.path.join(outdir, 'grid', '*.npz')))
+    options = _options('grid', opts)
+    totals = {}
+    other = 0
+    for filen in files:
+        with np.load(filen) as g:
+            if ('Options' not in g) or (str(g['Options']) != options):
+                other += 1
+                continue
+            counts = {k: g[k] for k in ['Lat', 'Lon', 'Profiles'] + opts['fields'] if k in g}
+            version = int(g['Version']) if 'Version' in g else 4
+        if not grid_add(totals, counts, version):
+            print('Warning: ' + filen + ' has a different grid, skipped')
+    if other:
+        print('Warning: %d grids made with other options not added' % other)
+
+    grid_save(outdir, totals)
+
+
+def grid_add(totals, counts, version):
+    """Adds the grid counts of a granule (see grid_counts) to totals,
+    {version: counts}. Returns False, and adds nothing, if the cells or
+    the values of a field differ from those already there"""
+
+    import numpy as np
+
+    total = totals.get(version)
+    if total is None:
+        totals[version] = {k: np.array(v) for k, v in counts.items()}
+        return(True)
+
+    for k, v in counts.items():
+        if (k in total) and (np.shape(v) != np.shape(total[k])):
+            return(False)
+    if not (np.array_equal(total['Lat'], counts['Lat']) and
+            np.array_equal(total['Lon'], counts['Lon'])):
+        return(False)
+
+    for k, v in counts.items():
+        if k in ['Lat', 'Lon']:
+            continue
+        total[k] = total[k] + v if k in total else np.array(v)
+    return(True)
+
+
+def grid_save(outdir, totals):
+    """Saves the totals of grid_add, one file per field and version (see
+    grid_file), with 'Counts' (value x lat x lon), 'Profiles' (lat x lon)
+    and the cell edges 'Lat' and 'Lon'"""
+
+    import numpy as np
+
+    for version, total in totals.items():
+        for tag in total:
+            if tag in ['Lat', 'Lon', 'Profiles']:
+                continue
+            out = grid_file(outdir, tag, version)
+            with open(out + '.tmp', 'wb') as f:
+                np.savez(f, Counts=total[tag], Profiles=total['Profiles'],
+                         Lat=total['Lat'], Lon=total['Lon'])
+            os.replace(out + '.tmp', out)
+
+
+def grid_file(outdir, field, version=4):
+    """Total grid of field, outdir/grid_<field>.npz for V4 products and
+    outdir/grid_<field>_v<version>.npz for the others"""
+    suffix = '' if version == 4 else '_v%d' % version
+    return(os.path.join(outdir, 'grid_' + field + suffix + '.npz'))
+
+
+def catalog(filen, outdir, opts):
+    """Time and coordinates of filen, for the catalog"""
+
+    if (filen in opts['done']) and not opts['overwrite']:
+        return({'status':'skipped'})
+    entry = catalog_entry(filen)
+    if not _overlaps(entry, opts['region'], opts['period']):
+        return({'empty':True})
+    return({'entry':entry, 'profiles':entry['profiles']})
+
+
+def catalog_entry(filen):
+    """CATALOG_ENTRY   Time and coordinates of a VFM granule
+
+        [entry] = CATALOG_ENTRY(filen) returns a dictionary with the
+        version, start and end time (TAI seconds), the latitude and
+        longitude range and the number of profiles of the VFM file
+        filen. Only the level 2 coordinates are read, not the data.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+    from pyhdf import SD
+    from . import vfm_read
+
+    h4sd = SD.SD(filen)
+    lat = np.float64(h4sd.select('Latitude').get()[:,0])
+    lon = np.float64(h4sd.select('Longitude').get()[:,0])
+    tim = np.float64(h4sd.select('Profile_Time').get()[:,0])
+    h4sd.end()
+
+    return({'file':filen, 'version':vfm_read.vfm_version(filen),
+            'start':tim[0], 'end':tim[-1],
+            'lat_min':np.min(lat), 'lat_max':np.max(lat),
+            'lon_min':np.min(lon), 'lon_max':np.max(lon),
+            'profiles':15*len(lat)})
+
+
+CATALOG_COLUMNS = ['file', 'version', 'start', 'end', 'lat_min', 'lat_max',
+                   'lon_min', 'lon_max', 'profiles']
+
+COMMANDS = {'decode':decode, 'quicklook':quicklook, 'grid':grid, 'catalog':catalog}
+
+
+def vfm_decoder(vfm_file):
+    """Decoder of the version of vfm_file (as returned by vfm_read), the
+    module vfm_type_v3 for V3 products and vfm_type for the others"""
+    if vfm_file['Version'] == 3:
+        from . import vfm_type_v3 as vfm_type
+    else:
+        from . import vfm_type
+    return(vfm_type)
+
+
+def grid_edges(res, region=None):
+    """Cell edges [lat, lon] of a grid of res degrees, over region
+    [S, N, W, E] or the whole world. W > E crosses the dateline, the
+    longitudes then go on past 180"""
+    import numpy as np
+    [s, n, w, e] = [-90., 90., -180., 180.] if region is None else region
+    if w > e:
+        e += 360.
+    lat = np.arange(s, n + res/2, res)
+    lon = np.arange(w, e + res/2, res)
+    return([lat, lon])
+
+
+def output_file(outdir, filen, ext):
+    """Output file of the granule filen, outdir/<granule><ext>"""
+    return(os.path.join(outdir, os.path.splitext(os.path.basename(filen))[0] + ext))
+
+
+def _options(command, opts):
+    # options the output of command depends on, as JSON
+    keys = {'decode':['fields', 'region', 'period'],
+            'grid':['fields', 'res', 'region', 'period']}[command]
+    return(json.dumps({k: opts[k] for k in keys}, sort_keys=True))
+
+
+def _done(out, command, opts):
+    # whether out exists and was made with the options of this run
+    import zipfile
+    import numpy as np
+    if opts['overwrite'] or not os.path.exists(out):
+        return(False)
+    try:
+        with np.load(out) as f:
+            return(('Options' in f) and (str(f['Options']) == _options(command, opts)))
+    except (OSError, ValueError, zipfile.BadZipFile):
+        # unreadable, made again
+        return(False)
+
+
+def _empty_read(outdir, command, opts):
+    # granules without profiles in the region and period of opts
+    filen = os.path.join(outdir, command + '_empty.txt')
+    if not os.path.exists(filen):
+        return([])
+    key = _empty_key(opts)
+    with open(filen) as f:
+        rows = [line.rstrip('\n').split('\t') for line in f]
+    return([r[0] for r in rows if (len(r) == 2) and (r[1] == key)])
+
+
+def _empty_write(outdir, command, opts, files):
+    # adds granules to those without profiles
+    if not files:
+        return
+    key = _empty_key(opts)
+    with open(os.path.join(outdir, command + '_empty.txt'), 'a') as f:
+        for filen in files:
+            f.write(filen + '\t' + key + '\n')
+
+
+def _empty_key(opts):
+    # region and period, a granule is empty for these only
+    return(json.dumps([opts['region'], opts['period']]))
+
+
+def _catalog_read(outdir):
+    # granules already in the catalog
+    import csv
+    filen = os.path.join(outdir, 'catalog.csv')
+    if not os.path.exists(filen):
+        return([])
+    with open(filen, newline='') as f:
+        return([row['file'] for row in csv.DictReader(f)])
+
+
+def _catalog_write(outdir, results):
+    # appends the new granules to the catalog
+    import csv
+    filen = os.path.join(outdir, 'catalog.csv')
+    new = not os.path.exists(filen)
+    with open(filen, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CATALOG_COLUMNS)
+        if new:
+            writer.writeheader()
+        for res in results.values():
+            if res.get('entry') is not None:
+                writer.writerow(res['entry'])
+
+
+def _read(filen, opts):
+    # reads and expands filen, keeps the profiles within the region and
+    # period, returns None if there is none
+    import numpy as np
+    from . import vfm_read
+    from . import vfm_expand
+
+    vfm_file = vfm_read.vfm_read(filen)
+    lat, lon = vfm_file['Latitude'], vfm_file['Longitude']
+    keep = np.ones(len(lat), dtype=bool)
+    if opts['region'] is not None:
+        keep &= _in_region(lat, lon, opts['region'])
+    if opts['period'] is not None:
+        keep &= (vfm_file['Time'] >= opts['period'][0]) & (vfm_file['Time'] <= opts['period'][1])
+    if not keep.any():
+        return(None)
+
+    vfm_file['Block'] = vfm_expand.vfm_expand(vfm_file['Data'])
+    if not keep.all():
+        vfm_file['Block'] = vfm_file['Block'][:, keep]
+        for k in ['Latitude', 'Longitude', 'Time']:
+            vfm_file[k] = vfm_file[k][keep]
+    return(vfm_file)
+
+
+def _in_region(lat, lon, region):
+    # region is [S, N, W, E], W > E crosses the dateline
+    [s, n, w, e] = region
+    inlon = (lon >= w) & (lon <= e) if w <= e else (lon >= w) | (lon <= e)
+    return((lat >= s) & (lat <= n) & inlon)
+
+
+def _overlaps(entry, region, period):
+    # whether a granule may have profiles in region and period
+    import numpy as np
+    if period is not None:
+        if (entry['end'] < period[0]) | (entry['start'] > period[1]):
+            return(False)
+    if region is not None:
+        [s, n, w, e] = region
+        if (entry['lat_max'] < s) | (entry['lat_min'] > n):
+            return(False)
+        lon = np.array([entry['lon_min'], entry['lon_max']])
+        # a granule spans a wide range of longitudes near the poles,
+        # only reject it when the range clearly misses the region
+        if (w <= e) & (entry['lon_max'] - entry['lon_min'] < 180.):
+            if (lon[1] < w) | (lon[0] > e):
+                return(False)
+    return(True)
+
+
+def _period(start, end):
+    # time filter as TAI seconds, None if there is none
+    import numpy as np
+    if (start is None) & (end is None):
+        return(None)
+    t0 = np.datetime64('1993-01-01T00:00:00', 's')
+    tai = lambda t, default: default if t is None else \
+        float((np.datetime64(t, 's') - t0) / np.timedelta64(1, 's'))
+    return([tai(start, -np.inf), tai(end, np.inf)])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,212 @@
+# Background maps already rendered, see map_background()
+_BACKGROUNDS = {}
+
+
+def map_plot(lat, lon, world=1, pad=20, map=[1,1,1,0,0,1], imgSize=[600,400], dpi=96,
+             cache=True, cachedir=None, simplify=True):
+    """MAP_PLOT Creates a map showing the calipso track [fig, ax, gl] =
+        MAP_PLOT(lat, lon) takes calipson track coordinates and plot
+        on the world map. lat and lon are single column arrays of the
+        same length. The function returns handlers to the figure, axis
+        and gridlines.
+
+        MAP_PLOT(..., world=1, pad=20) uses optional keywords to
+        specify the region of the map to be shown. world=1 (default)
+        means the whole world (90S-90N 180W-180E). If 0 < world < 1,
+        only a fraction of the world will be shown and centered on the
+        calipso track. If world=0, the map bondary will be given by
+        the limits of lat,lon with a padding around it.
+
+        MAP_PLOT(..., map=[1,1,1,0,0,1]) controls whether coastlines,
+        country borders, states limits, rivers, lakes and ocean are
+        drawn (=1) or not drawn (=0).
+
+        MAP_PLOT(..., imgSize=[600,400], dpi=96) change the default
+        image size and resolution.
+
+        MAP_PLOT(..., cache=True, cachedir=None) draws the map features
+        (coastlines, borders, etc) from a raster rendered once for each
+        extent, set of features and image size, and kept in memory (see
+        map_background). The raster covers the extent enlarged to round
+        degrees, so maps of nearby tracks (e.g. with 0 < world < 1)
+        share it. If cachedir is given, the rasters are also saved there
+        and reused by other processes. With cache=False the features are
+        drawn as vectors, as before.
+
+        MAP_PLOT(lats, lons) with lats and lons lists of arrays plots
+        all tracks (e.g. hundreds of granules) on one map, as a single
+        line, and the map limits are computed from all of them.
+
+        MAP_PLOT(..., simplify=True) removes the track points that would
+        not change the line by more than half a pixel (see
+        track_simplify), and breaks the line where it crosses the
+        dateline. Use simplify=False to plot all points.
+
+        History: 
+           2026-oct-19 Background maps of round extents, shared by
+                       nearby tracks.
+
+           2026-oct-19 Cached background maps, several tracks in one
+                       call. world=1 now shows the whole world, as
+                       described above. Tracks are simplified.
+
+           2021-may-27 First working version
+
+    """
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import cartopy.crs as ccrs
+
+    if isinstance(lat, (list, tuple)):
+        # join all tracks in one line, separated by NaNs
+        nan = [np.array([np.nan])]
+        lat = np.concatenate([np.append(np.float64(x), np.nan) for x in lat] or nan)
+        lon = np.concatenate([np.append(np.float64(x), np.nan) for x in lon] or nan)
+
+    fig = plt.figure(figsize=np.float64(imgSize)/dpi, dpi=dpi, clear=True)
+    ax = plt.axes(projection=ccrs.PlateCarree())
+
+    if world == 1:
+        minlat, maxlat, minlon, maxlon = -90, 90, -180, 180
+        pad = 0
+
+    elif (world > 0.) & (world < 1.):
+        lat0, lon0 = np.nanmean(lat), np.nanmean(lon)
+        minlat, maxlat = max(lat0-90*world,-90), min(lat0+90*world,90)
+        minlon, maxlon = lon0-180*world, lon0+180*world
+        pad = 0
+        
+    else: 
+        minlat, maxlat = np.nanmin(lat), np.nanmax(lat)
+        minlon, maxlon = np.nanmin(lon), np.nanmax(lon)
+
+    extent = [minlon - pad, maxlon + pad, minlat - pad, maxlat + pad]
+
+    # add map
+    if cache:
+        # same pixel size as the map, over a larger extent
+        bgextent = _snap_extent(extent)
+        bgsize = [int(round(imgSize[0]*(bgextent[1] - bgextent[0])/(extent[1] - extent[0]))),
+                  int(round(imgSize[1]*(bgextent[3] - bgextent[2])/(extent[3] - extent[2])))]
+        bg = map_background(bgextent, map=map, imgSize=bgsize, dpi=dpi, cachedir=cachedir)
+        ax.imshow(bg, origin='upper', extent=bgextent, transform=ccrs.PlateCarree(),
+                  interpolation='nearest', zorder=0)
+    else:
+        _add_features(ax, map)
+
+    ax.set_extent(extent)
+
+    # plot calipso track
+    if simplify:
+        from . import track_simplify
+        tol = track_simplify.track_tolerance(extent, imgSize)
+        lat, lon = track_simplify.track_simplify(lat, lon, tol)
+    plt.plot(lon, lat, '-b')
+
+    #plt.scatter(-67.8076, -9.974, s=30, c='m', marker='o')
+    gl = ax.gridlines(draw_labels=True,linewidth=1, color='gray', alpha=0.5, linestyle=':')
+    #gl.top_labels = False
+    #gl.right_labels = False
+    #gl.xlocator = mticker.FixedLocator([-80, -75, -70, -65, -60, -55, -50, -45, -40])
+    #gl.ylocator = mticker.FixedLocator([-20, -15, -10, -5, 0])
+
+    return([fig, ax, gl])
+
+
+def map_background(extent, map=[1,1,1,0,0,1], imgSize=[600,400], dpi=96, cachedir=None):
+    """MAP_BACKGROUND Renders the map features as a raster
+
+        [bg] = MAP_BACKGROUND(extent) returns an RGBA image (uint8) of
+        the map features inside extent=[minlon, maxlon, minlat, maxlat],
+        in the PlateCarree projection, fitting in imgSize pixels. map,
+        imgSize and dpi are as in map_plot.
+
+        Each background is rendered once, without pyplot, and kept in
+        memory. If cachedir is given, it is also saved there as a .npy
+        file and loaded from there by later calls or other processes.
+
+        History:
+           2026-oct-19 First version
+
+    """
+    import os
+    import hashlib
+    import numpy as np
+
+    key = (tuple(np.round(np.float64(extent), 4)), tuple(map),
+           tuple(imgSize), dpi)
+    if key in _BACKGROUNDS:
+        return(_BACKGROUNDS[key])
+
+    if cachedir is not None:
+        filen = os.path.join(cachedir, 'map_%s.npy' % hashlib.md5(repr(key).encode()).hexdigest())
+        if os.path.exists(filen):
+            _BACKGROUNDS[key] = np.load(filen)
+            return(_BACKGROUNDS[key])
+
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    import cartopy.crs as ccrs
+
+    # largest image with the aspect of the extent that fits in imgSize
+    dlon, dlat = extent[1] - extent[0], extent[3] - extent[2]
+    scale = min(imgSize[0]/dlon, imgSize[1]/dlat)
+    w, h = max(int(round(dlon*scale)), 1), max(int(round(dlat*scale)), 1)
+
+    fig = Figure(figsize=(w/dpi, h/dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1], projection=ccrs.PlateCarree())
+    ax.set_extent(extent, crs=ccrs.PlateCarree())
+    ax.set_aspect('auto')
+    ax.spines['geo'].set_visible(False)
+    ax.patch.set_visible(False)
+    fig.patch.set_alpha(0)
+    _add_features(ax, map)
+    canvas.draw()
+    bg = np.array(canvas.buffer_rgba())
+
+    _BACKGROUNDS[key] = bg
+    if cachedir is not None:
+        os.makedirs(cachedir, exist_ok=True)
+        # write then rename, so other processes never see half a file
+        tmp = filen + '.%d.tmp.npy' % os.getpid()
+        np.save(tmp, bg)
+        os.replace(tmp, filen)
+
+    return(bg)
+
+
+def _snap_extent(extent):
+    # extent enlarged to multiples of a round step (1, 2 or 5 x 10^n
+    # degrees, about a quarter of its size), not beyond the poles unless
+    # extent already is
+    import numpy as np
+    snapped = []
+    for lo, hi, lim in [(extent[0], extent[1], np.inf), (extent[2], extent[3], 90.)]:
+        d = (hi - lo)/4
+        if not d > 0:
+            snapped += [lo, hi]
+            continue
+        step = 10**np.floor(np.log10(d))
+        step *= [1, 2, 5, 10][np.searchsorted([1.5, 3.5, 7.5], d/step)]
+        snapped += [max(np.floor(lo/step)*step, min(lo, -lim)),
+                    min(np.ceil(hi/step)*step, max(hi, lim))]
+    return([float(x) for x in snapped])
+
+
+def _add_features(ax, map):
+    # draws the map features selected in map, see map_plot
+    import cartopy.feature as cfeature
+
+    if map[0]:
+        ax.add_feature(cfeature.COASTLINE, linewidth=1.5, linestyle='-', edgecolor='black', alpha=.8)
+    if map[1]:
+        ax.add_feature(cfeature.BORDERS, linewidth=1.5, linestyle='-', edgecolor='black', alpha=.8)
+    if map[2]:
+        ax.add_feature(cfeature.STATES, linewidth=1.5, linestyle='-', edgecolor='gray', alpha=.5)
+    if map[3]:
+        ax.add_feature(cfeature.RIVERS, linewidth=1, linestyle='-', edgecolor='blue', alpha=.5)
+    if map[4]:
+        ax.add_feature(cfeature.LAKES, linewidth=1, linestyle='-', edgecolor='green', alpha=.5)
+    if map[5]:
+        ax.add_feature(cfeature.OCEAN, facecolor='lightblue', zorder=0)
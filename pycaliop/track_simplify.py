@@ -0,0 +1,99 @@
+def track_simplify(lat, lon, tol):
+    """TRACK_SIMPLIFY   Simplifies a calipso track for plotting
+
+        [lat_s, lon_s] = TRACK_SIMPLIFY(lat, lon, tol) removes the points
+        of the track that are not needed to draw it within tol degrees,
+        using the Douglas-Peucker algorithm on the lat/lon plane (as in
+        the PlateCarree projection used by map_plot). All segments are
+        refined at the same time, with array operations, rather than
+        recursively.
+
+        The track is split where it crosses the dateline (longitude
+        jumps by more than 180 degrees) and where lat or lon are NaN
+        (e.g. between tracks joined by map_plot). Each piece is
+        simplified on its own, and pieces are separated by NaNs in the
+        output, so no line is drawn across the map.
+
+        A tolerance of half a pixel makes no visible difference, see
+        track_tolerance().
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+
+    lat = np.ravel(np.float64(lat))
+    lon = np.ravel(np.float64(lon))
+    n = len(lat)
+    if n < 3:
+        return([lat, lon])
+
+    bad = np.isnan(lat) | np.isnan(lon)
+    # first point after a dateline crossing
+    jump = np.zeros(n, dtype=bool)
+    jump[1:] = np.abs(np.diff(lon)) > 180.
+
+    # ends of each piece are always kept
+    keep = bad.copy()
+    keep[0] = keep[-1] = True
+    keep[1:] |= bad[:-1] | jump[1:]
+    keep[:-1] |= bad[1:] | jump[1:]
+
+    x = np.where(bad, 0., lon)
+    y = np.where(bad, 0., lat)
+    active = ~keep
+    while active.any():
+        k = np.flatnonzero(keep)
+        idx = np.flatnonzero(active)
+        # segment of each active point, between two kept points
+        seg = np.searchsorted(k, idx, side='right') - 1
+        a, b = k[seg], k[seg + 1]
+
+        dx, dy = x[b] - x[a], y[b] - y[a]
+        px, py = x[idx] - x[a], y[idx] - y[a]
+        norm = np.hypot(dx, dy)
+        dist = np.where(norm > 0, np.abs(dx*py - dy*px) / np.where(norm > 0, norm, 1.),
+                        np.hypot(px, py))
+
+        # farthest point of each segment (seg is sorted)
+        start = np.concatenate([[0], np.flatnonzero(np.diff(seg)) + 1])
+        segmax = np.repeat(np.maximum.reduceat(dist, start),
+                           np.diff(np.append(start, len(seg))))
+        far = (dist == segmax) & (dist > tol)
+        useg, first = np.unique(seg[far], return_index=True)
+        new = idx[far][first]
+
+        keep[new] = True
+        # segments within tolerance are done
+        active[idx[segmax <= tol]] = False
+        active[new] = False
+
+    # NaN between pieces
+    ind = np.flatnonzero(keep & ~bad)
+    gap = (np.diff(ind) > 1) & bad[np.minimum(ind[:-1] + 1, n - 1)]
+    brk = np.flatnonzero(jump[ind[1:]] | gap) + 1
+    lat_s = np.insert(lat[ind], brk, np.nan)
+    lon_s = np.insert(lon[ind], brk, np.nan)
+
+    return([lat_s, lon_s])
+
+
+def track_tolerance(extent, imgSize, pixels=0.5):
+    """TRACK_TOLERANCE   Tolerance to simplify a track on a map
+
+        [tol] = TRACK_TOLERANCE(extent, imgSize) returns the size in
+        degrees of half a pixel, for a map with extent=[minlon, maxlon,
+        minlat, maxlat] drawn on a figure of imgSize=[width, height]
+        pixels (i.e. figsize times dpi, as in map_plot). Use pixels= to
+        change the fraction of pixel.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    dlon = abs(extent[1] - extent[0])
+    dlat = abs(extent[3] - extent[2])
+    return(pixels * min(dlon/imgSize[0], dlat/imgSize[1]))
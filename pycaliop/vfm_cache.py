@@ -0,0 +1,278 @@
+"""On-disk cache of derived products
+
+    from pycaliop import vfm_cache
+    vfm_file = vfm_cache.vfm_cached(vfm_read.vfm_read, filen)
+    grid = vfm_cache.vfm_cached(my_grid, filen, res=2.)
+
+runs func(filen, ...) once, and later calls with the same granule,
+function, parameters and pycaliop version load the result from the cache
+directory. Functions are identified by module, name and a hash of their
+code (with their defaults and the values of their closure), so two
+lambdas, or a function that was edited, do not share entries. Results
+can be arrays, or lists, tuples and dictionaries of arrays, numbers and
+strings (e.g. what vfm_read or vfm_type return). Other results (e.g.
+arrays of objects) are returned with a warning, and not cached.
+
+Granules are identified by path, size and modification time, or by a
+hash of their content with content=True (files can then be moved or
+copied). Entries are written to a temporary file and renamed, so several
+processes can share the cache. When the cache grows beyond maxsize
+bytes, the least recently used entries are removed.
+
+The cache directory is cachedir=, or PYCALIOP_CACHE, or
+~/.cache/pycaliop, and maxsize is maxsize=, or PYCALIOP_CACHE_SIZE, or
+10 GB. Hits and misses are counted in cache_stats(), and in vfm_stats as
+stages 'cache:hit' and 'cache:miss'.
+
+History:
+   2026-oct-19 Keys include the code of the function, tuples are kept,
+               results that cannot be cached are reported.
+
+   2026-oct-19 First version
+
+"""
+
+import os
+
+_STATS = {'hits':0, 'misses':0, 'evictions':0, 'bytes_read':0, 'bytes_written':0}
+# content hashes already computed, by (path, size, mtime)
+_HASHES = {}
+
+
+def vfm_cached(func, filen, *args, cachedir=None, maxsize=None, content=False, **kwargs):
+    """VFM_CACHED   Result of a function of a granule, from the cache
+
+        [out] = VFM_CACHED(func, filen, *args, **kwargs) returns
+        func(filen, *args, **kwargs), loaded from the cache if it was
+        already computed for the same granule, function, parameters and
+        pycaliop version, or computed and saved in the cache otherwise.
+
+        cachedir, maxsize and content are described in the help of the
+        module.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import warnings
+    import zipfile
+    import numpy as np
+    from . import vfm_stats
+
+    cachedir = cache_dir(cachedir)
+    key = cache_key(func, filen, args, kwargs, content=content)
+    path = os.path.join(cachedir, key + '.npz')
+
+    t0 = vfm_stats.start()
+    try:
+        with np.load(path) as f:
+            out = _decode(f)
+        size = os.path.getsize(path)
+        # most recently used
+        os.utime(path)
+        _STATS['hits'] += 1
+        _STATS['bytes_read'] += size
+        vfm_stats.stop(t0, 'cache:hit', bytes_read=size)
+        return(out)
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        # not there, or unreadable: computed again
+        pass
+
+    out = func(filen, *args, **kwargs)
+
+    arrays = {}
+    try:
+        meta = _encode(out, arrays)
+    except TypeError as err:
+        warnings.warn('vfm_cached: result of ' + getattr(func, '__qualname__', repr(func)) +
+                      ' not cached, ' + str(err), stacklevel=2)
+        return(out)
+    arrays['__meta__'] = np.array(meta)
+
+    os.makedirs(cachedir, exist_ok=True)
+    # write then rename, so other processes never see half a file
+    tmp = path + '.%d.tmp.npz' % os.getpid()
+    np.savez(tmp, **arrays)
+    os.replace(tmp, path)
+    size = os.path.getsize(path)
+    _STATS['misses'] += 1
+    _STATS['bytes_written'] += size
+    vfm_stats.stop(t0, 'cache:miss', nbytes=size)
+
+    cache_evict(cachedir, maxsize)
+
+    return(out)
+
+
+def cache_key(func, filen, args=(), kwargs={}, content=False):
+    """Hash (hex string) identifying func(filen, *args, **kwargs), see
+    vfm_cached"""
+
+    import hashlib
+    from . import __version__
+
+    st = os.stat(filen)
+    if content:
+        ident = (st.st_size, st.st_mtime_ns, os.path.abspath(filen))
+        if ident not in _HASHES:
+            h = hashlib.sha256()
+            with open(filen, 'rb') as f:
+                for block in iter(lambda: f.read(2**22), b''):
+                    h.update(block)
+            _HASHES[ident] = h.hexdigest()
+        source = _HASHES[ident]
+    else:
+        source = repr((os.path.abspath(filen), st.st_size, st.st_mtime_ns))
+
+    h = hashlib.sha256()
+    h.update(repr((source, __version__)).encode())
+    _digest_func(func, h)
+    _digest(args, h)
+    _digest(sorted(kwargs.items()), h)
+
+    return(h.hexdigest())
+
+
+def cache_dir(cachedir=None):
+    """Cache directory: cachedir, or PYCALIOP_CACHE, or ~/.cache/pycaliop"""
+    if cachedir is not None:
+        return(cachedir)
+    return(os.environ.get('PYCALIOP_CACHE',
+                          os.path.join(os.path.expanduser('~'), '.cache', 'pycaliop')))
+
+
+def cache_evict(cachedir=None, maxsize=None):
+    """Removes the least recently used entries until the cache is
+    smaller than maxsize bytes, returns the bytes left"""
+
+    if maxsize is None:
+        maxsize = float(os.environ.get('PYCALIOP_CACHE_SIZE', 10e9))
+    cachedir = cache_dir(cachedir)
+
+    entries = []
+    try:
+        with os.scandir(cachedir) as it:
+            for e in it:
+                if e.name.endswith('.npz') and not e.name.endswith('.tmp.npz'):
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path))
+    except FileNotFoundError:
+        return(0)
+
+    total = sum(e[1] for e in entries)
+    for mtime, size, path in sorted(entries):
+        if total <= maxsize:
+            break
+        try:
+            os.remove(path)
+            _STATS['evictions'] += 1
+        except FileNotFoundError:
+            # removed by another process
+            pass
+        total -= size
+
+    return(total)
+
+
+def cache_clear(cachedir=None):
+    """Removes all entries of the cache"""
+    cache_evict(cachedir, maxsize=0)
+
+
+def cache_stats():
+    """Hits, misses, evictions, bytes read and written by this process"""
+    return(dict(_STATS))
+
+
+def _encode(obj, arrays):
+    # JSON description of obj, with its arrays moved to arrays
+    import json
+    import numpy as np
+
+    def enc(o):
+        if isinstance(o, np.ndarray):
+            if o.dtype.hasobject:
+                # np.load cannot read them back without pickle
+                raise TypeError('cannot cache arrays of objects')
+            name = 'a%d' % len(arrays)
+            arrays[name] = o
+            return({'__array__':name})
+        if isinstance(o, dict):
+            return({'__dict__':[[enc(k), enc(v)] for k, v in o.items()]})
+        if isinstance(o, tuple):
+            return({'__tuple__':[enc(v) for v in o]})
+        if isinstance(o, list):
+            return([enc(v) for v in o])
+        if isinstance(o, np.generic):
+            return(o.item())
+        if (o is None) or isinstance(o, (bool, int, float, str)):
+            return(o)
+        raise TypeError('cannot cache results of type ' + type(o).__name__)
+
+    return(json.dumps(enc(obj)))
+
+
+def _decode(f):
+    # inverse of _encode, f is the opened .npz file
+    import json
+
+    def dec(o):
+        if isinstance(o, dict):
+            if '__array__' in o:
+                return(f[o['__array__']])
+            if '__tuple__' in o:
+                return(tuple(dec(v) for v in o['__tuple__']))
+            return({dec(k): dec(v) for k, v in o['__dict__']})
+        if isinstance(o, list):
+            return([dec(v) for v in o])
+        return(o)
+
+    return(dec(json.loads(str(f['__meta__']))))
+
+
+def _digest(obj, h):
+    # adds the parameters obj to the hash h, arrays by content
+    import numpy as np
+    if isinstance(obj, np.ndarray):
+        h.update(repr((obj.dtype.str, obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        _digest(sorted(obj.items(), key=repr), h)
+    elif isinstance(obj, (list, tuple)):
+        h.update(b'[')
+        for o in obj:
+            _digest(o, h)
+        h.update(b']')
+    else:
+        h.update(repr(obj).encode())
+
+
+def _digest_func(func, h):
+    # adds the function func to the hash h: its name, code, defaults and
+    # closure, partial() by its function and arguments
+    import functools
+    if isinstance(func, functools.partial):
+        _digest_func(func.func, h)
+        _digest([func.args, func.keywords], h)
+        return
+    h.update(repr((getattr(func, '__module__', None),
+                   getattr(func, '__qualname__', type(func).__qualname__))).encode())
+    code = getattr(func, '__code__', None)
+    if code is not None:
+        _digest_code(code, h)
+        _digest([func.__defaults__, func.__kwdefaults__], h)
+        if func.__closure__:
+            _digest([c.cell_contents for c in func.__closure__], h)
+
+
+def _digest_code(code, h):
+    # adds a code object to the hash h, with those of nested functions
+    import types
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode())
+    for c in code.co_consts:
+        if isinstance(c, types.CodeType):
+            _digest_code(c, h)
+        else:
+            h.update(repr(c).encode())
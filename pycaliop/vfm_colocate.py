@@ -0,0 +1,189 @@
+def vfm_colocate_index(lat, lon, alt, grid_lat, grid_lon, grid_alt,
+                       time=None, grid_time=None, pixels=None):
+    """VFM_COLOCATE_INDEX   Interpolation indexes of a VFM curtain on a grid
+
+        [ind] = VFM_COLOCATE_INDEX(lat, lon, alt, grid_lat, grid_lon,
+        grid_alt) computes, once, the indexes and weights needed to
+        sample a gridded model field along the VFM curtain. lat and
+        lon are single column arrays with one value per expanded
+        profile (i.e. 15 per VFM row, the same used for vfm_plot), and
+        alt is the VFM altitude axis (545 levels, km). grid_lat,
+        grid_lon and grid_alt are the 1D axes of the model grid, in
+        degrees and km, and can be ascending or descending. If
+        grid_lon covers the whole globe it is treated as periodic.
+
+        [ind] = VFM_COLOCATE_INDEX(..., time=t, grid_time=gt) does the
+        same for 4D fields, with t the time of each expanded profile
+        and gt the time axis of the grid, in the same units (numbers
+        or np.datetime64).
+
+        ind is a dictionary with the lower index and the weight of the
+        upper neighbour along each axis, together with a 'Valid' mask
+        shaped like the vfm_type data (nzlev x total_times) that is
+        False for points outside the grid. It can be passed to
+        vfm_colocate() for any number of variables on the same grid.
+
+        [ind] = VFM_COLOCATE_INDEX(..., pixels=sparse) samples the grid
+        only at the pixels of a table returned by vfm_sparse, and
+        vfm_colocate then returns one value per pixel of the table.
+
+        History:
+           2026-oct-19 Added pixels=, for tables of vfm_sparse.
+
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+
+    lat = np.ravel(np.float64(lat))
+    lon = np.ravel(np.float64(lon))
+    alt = np.ravel(np.float64(alt))
+
+    if lat.shape != lon.shape:
+        import sys
+        sys.exit('lat and lon should have the same length.')
+
+    ilat, wlat, vlat = _axis_index(grid_lat, lat)
+    ilon, wlon, vlon = _axis_index(grid_lon, lon, periodic=True)
+    ialt, walt, valt = _axis_index(grid_alt, alt)
+
+    ind = {'Lat':(ilat, wlat), 'Lon':(ilon, wlon), 'Alt':(ialt, walt),
+           'Time':None,
+           'Shape':(len(grid_alt), len(grid_lat), len(grid_lon))}
+
+    valid_t = vlat & vlon
+    if time is not None:
+        if grid_time is None:
+            import sys
+            sys.exit('grid_time is required when time is given.')
+        itim, wtim, vtim = _axis_index(_as_float(grid_time), np.ravel(_as_float(time)))
+        ind['Time'] = (itim, wtim)
+        ind['Shape'] = (len(grid_time),) + ind['Shape']
+        valid_t = valid_t & vtim
+
+    if pixels is None:
+        ind['Valid'] = valt[:, None] & valid_t[None, :]
+    else:
+        ind['Pixels'] = (pixels['Level'], pixels['Profile'])
+        ind['Valid'] = valt[pixels['Level']] & valid_t[pixels['Profile']]
+
+    return(ind)
+
+
+def vfm_colocate(field, ind, fill=float('nan')):
+    """VFM_COLOCATE   Samples a gridded field along the VFM curtain
+
+        [data] = VFM_COLOCATE(field, ind) interpolates field, an array
+        shaped (alt, lat, lon) or (time, alt, lat, lon), along the
+        CALIPSO track using the indexes returned by
+        vfm_colocate_index(). Interpolation is linear along each axis
+        (trilinear for 3D fields, quadrilinear for 4D fields) and is
+        done for all levels and profiles at once.
+
+        data has the same shape as the vfm_type data (nzlev x
+        total_times), so it can be compared pixel by pixel with the
+        VFM flags, or one value per pixel of the vfm_sparse table given
+        to vfm_colocate_index. Points outside the grid are set to fill
+        (NaN by default).
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+    import sys
+
+    field = np.asarray(field)
+    if field.shape != ind['Shape']:
+        sys.exit('field has shape %s but the index was built for %s'
+                 %(str(field.shape), str(ind['Shape'])))
+
+    ilat, wlat = ind['Lat']
+    ilon, wlon = ind['Lon']
+    ialt, walt = ind['Alt']
+    nlon = field.shape[-1]
+
+    # corners are (lower, upper) along each axis; the vertical axis
+    # varies along the first dimension of the output, the others along
+    # the second one. For a table of pixels, all vary along the table.
+    if ind.get('Pixels') is None:
+        lev, prof = (slice(None), None), (None, slice(None))
+    else:
+        lev, prof = ind['Pixels']
+    k0, k1 = ialt[lev], ialt[lev] + 1
+    wk = walt[lev]
+    j0, j1 = ilat[prof], ilat[prof] + 1
+    wj = wlat[prof]
+    i0, i1 = ilon[prof], np.mod(ilon[prof] + 1, nlon)
+    wi = wlon[prof]
+
+    if ind['Time'] is None:
+        times = [(None, 1.)]
+    else:
+        itim, wtim = ind['Time']
+        # weights along time only depend on the profile
+        times = [(itim[prof], 1. - wtim[prof]),
+                 (np.minimum(itim + 1, field.shape[0] - 1)[prof], wtim[prof])]
+
+    data = np.zeros(ind['Valid'].shape, dtype=np.float64)
+    for t, wt in times:
+        for k, a in ((k0, 1. - wk), (k1, wk)):
+            for j, b in ((j0, 1. - wj), (j1, wj)):
+                for i, c in ((i0, 1. - wi), (i1, wi)):
+                    if t is None:
+                        data += (wt * a * b * c) * field[k, j, i]
+                    else:
+                        data += (wt * a * b * c) * field[t, k, j, i]
+
+    data[~ind['Valid']] = fill
+
+    return(data)
+
+
+def _axis_index(axis, x, periodic=False):
+    # Lower neighbour index, weight of the upper neighbour and valid
+    # mask for each x on a monotonic 1D axis. Descending axes are
+    # handled by flipping them. Periodic axes (longitudes covering 360
+    # degrees) wrap around, and the upper neighbour of the last point
+    # is taken modulo the axis length by the caller.
+    import numpy as np
+
+    axis = np.ravel(np.float64(axis))
+    n = len(axis)
+    flip = (n > 1) and (axis[-1] < axis[0])
+    if flip:
+        axis = axis[::-1]
+
+    if periodic and (n > 1) and (axis[-1] - axis[0] + (axis[1] - axis[0]) >= 360. - 1e-6):
+        x = axis[0] + np.mod(x - axis[0], 360.)
+        ext = np.append(axis, axis[0] + 360.)
+        i = np.clip(np.searchsorted(ext, x, side='right') - 1, 0, n - 1)
+        w = (x - ext[i]) / (ext[i + 1] - ext[i])
+        valid = np.isfinite(x)
+        if flip:
+            # going backwards, the upper neighbour is the previous point
+            i, w = np.mod(n - 2 - i, n), 1. - w
+        return(i, w, valid)
+
+    valid = (x >= axis[0]) & (x <= axis[-1])
+    i = np.clip(np.searchsorted(axis, x, side='right') - 1, 0, max(n - 2, 0))
+    if n > 1:
+        w = np.clip((x - axis[i]) / (axis[i + 1] - axis[i]), 0., 1.)
+    else:
+        w = np.zeros(x.shape)
+    if flip:
+        i, w = np.maximum(n - 2 - i, 0), 1. - w
+
+    return(i, w, valid)
+
+
+def _as_float(t):
+    # times may be given as np.datetime64, convert to seconds
+    import numpy as np
+
+    t = np.asarray(t)
+    if np.issubdtype(t.dtype, np.datetime64):
+        return(t.astype('datetime64[ms]').astype(np.float64) / 1000.)
+    return(np.float64(t))
@@ -0,0 +1,76 @@
+def vfm_column(vfm, alt, chunk=4096):
+    """VFM_COLUMN   Summary of each profile of the feature type
+
+        [column] = VFM_COLUMN(vfm, alt) computes, for every profile of
+        the feature type returned by vfm_type(vfm_block, 'type') (or its
+        'Data' alone, nzlev x total_times), the following quantities,
+        with alt the altitude of the levels (km, as returned by
+        vfm_read):
+
+           'CloudTop', 'CloudBase', the altitude of the highest cloud
+                       pixel and of the lowest one
+           'AerosolTop', 'AerosolBase', the same for aerosol
+           'Surface', the altitude of the (highest) surface pixel
+           'Attenuated', the altitude of the highest totally attenuated
+                       pixel, where the signal is lost
+           'Layers', the number of feature layers (cloud, aerosol and
+                     stratospheric), counted as runs of the same type
+           'CloudLayers', 'AerosolLayers', the same for each type
+
+        Altitudes are NaN (and layer counts 0) in profiles without such
+        pixels. column is a dictionary with one float32 (altitudes) or
+        int16 (counts) array of total_times values per quantity.
+
+        All profiles are done at once with argmax and sum reductions over
+        the levels, chunk profiles at a time so that each chunk is read
+        from memory only once.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+
+    data = vfm['Data'] if isinstance(vfm, dict) else vfm
+    alt = np.ravel(np.float32(alt))
+    if alt[0] < alt[-1]:
+        # levels from the top, as in the VFM
+        data, alt = data[::-1], alt[::-1]
+    [nz, nt] = data.shape
+
+    keys = ['CloudTop', 'CloudBase', 'AerosolTop', 'AerosolBase', 'Surface', 'Attenuated']
+    column = {k: np.full(nt, np.nan, dtype=np.float32) for k in keys}
+    for k in ['Layers', 'CloudLayers', 'AerosolLayers']:
+        column[k] = np.zeros(nt, dtype=np.int16)
+
+    def first(mask):
+        # altitude of the highest True of each column, NaN if none
+        i = np.argmax(mask, axis=0)
+        return(np.where(mask[i, np.arange(mask.shape[1])], alt[i], np.nan))
+
+    def last(mask):
+        # altitude of the lowest True of each column, NaN if none
+        i = nz - 1 - np.argmax(mask[::-1], axis=0)
+        return(np.where(mask[i, np.arange(mask.shape[1])], alt[i], np.nan))
+
+    for j in range(0, nt, chunk):
+        d = np.asarray(data[:, j:j+chunk])
+        cols = slice(j, j + d.shape[1])
+        cloud = d == 2
+        aerosol = d == 3
+        column['CloudTop'][cols] = first(cloud)
+        column['CloudBase'][cols] = last(cloud)
+        column['AerosolTop'][cols] = first(aerosol)
+        column['AerosolBase'][cols] = last(aerosol)
+        column['Surface'][cols] = first(d == 5)
+        column['Attenuated'][cols] = first(d == 7)
+
+        # first pixel of each layer, a feature with a different type above
+        start = (d >= 2) & (d <= 4)
+        start[1:] &= d[1:] != d[:-1]
+        column['Layers'][cols] = np.sum(start, axis=0)
+        column['CloudLayers'][cols] = np.sum(start & cloud, axis=0)
+        column['AerosolLayers'][cols] = np.sum(start & aerosol, axis=0)
+
+    return(column)
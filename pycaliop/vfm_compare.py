@@ -0,0 +1,348 @@
+"""Comparison of the classification of two versions of the VFM
+
+    from pycaliop import vfm_compare
+    pairs = vfm_compare.vfm_match(glob.glob('v3/*.hdf'), glob.glob('v4/*.hdf'))
+    res = vfm_compare.vfm_compare_batch(pairs, fields=['type', 'phase'])
+    vfm_compare.compare_save('v3_v4.npz', res)
+
+matches the granules of two versions of the product (e.g. V3 and V4)
+and, for each field, counts the pixels classified as value a by the
+first one and as value b by the second one (a confusion matrix), in
+altitude and latitude bands. Each version is decoded with its own rules
+(vfm_type_v3 or vfm_type).
+
+The profiles of two matched granules are aligned by profile time, and
+only the rows within tol_time seconds and tol_deg degrees of each other
+are compared. The counts of all pixels are done at once with a single
+bincount of a combined code (altitude band, latitude band, a and b) for
+each field. Results are sums of counts, so the results of different
+granules, workers or runs are merged by adding them (compare_merge).
+
+History:
+   2026-oct-19 Spare codes are not counted, compare_save writes the
+               .npz itself.
+
+   2026-oct-19 First version
+
+"""
+
+ALT_EDGES = [-0.5, 2., 4., 6., 8.2, 12., 16., 20.2, 30.1]
+LAT_EDGES = [-90., -60., -30., 0., 30., 60., 90.]
+
+
+def vfm_match(files_a, files_b, tol=60.):
+    """VFM_MATCH   Matches the granules of two versions of the VFM
+
+        [pairs] = VFM_MATCH(files_a, files_b) returns the list of [file_a,
+        file_b] of granules of files_a and files_b that start within tol
+        seconds of each other, going by their file names (see
+        vfm_granule_time). Each granule is used at most once.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+    from . import vfm_read
+
+    def times(files):
+        t = [vfm_read.vfm_granule_time(f) for f in files]
+        keep = [i for i in range(len(files)) if t[i] is not None]
+        t = np.array([t[i] for i in keep], dtype='datetime64[s]').astype(np.float64)
+        order = np.argsort(t)
+        return([[files[keep[i]] for i in order], t[order]])
+
+    [fa, ta] = times(list(files_a))
+    [fb, tb] = times(list(files_b))
+    if len(fb) == 0:
+        return([])
+
+    j = _nearest(tb, ta)
+    pairs = []
+    used = set()
+    for i in np.argsort(np.abs(tb[j] - ta)):
+        if (np.abs(tb[j[i]] - ta[i]) <= tol) and (j[i] not in used):
+            used.add(j[i])
+            pairs.append([fa[i], fb[j[i]]])
+
+    return(sorted(pairs))
+
+
+def vfm_compare(file_a, file_b, fields=['type'], alt_edges=ALT_EDGES,
+                lat_edges=LAT_EDGES, tol_time=0.1, tol_deg=0.05,
+                versions=None, chunk=500):
+    """VFM_COMPARE   Confusion matrices of two versions of a granule
+
+        [res] = VFM_COMPARE(file_a, file_b, fields) aligns the rows of the
+        VFM files file_a and file_b (the same granule, from two versions
+        of the product) by profile time, keeping the rows within tol_time
+        seconds and tol_deg degrees of latitude and longitude of each
+        other, decodes each field in fields with the rules of the
+        version of each file (vfm_version, or versions=[va, vb]) and
+        counts the pixels of each pair of values. res is a dictionary:
+
+           'Counts', for each field, the number of pixels (int64, nalt x
+                     nlat x na x nb) in each altitude band (alt_edges, km)
+                     and latitude band (lat_edges) with value a in file_a
+                     and value b in file_b. Values go from 'Vmin'.
+           'Vmin', 'ByteTxt', for each field, [a, b] of each version
+           'AltEdges', 'LatEdges', 'Versions', as used
+           'Granules', 1, 'Profiles', the number of profiles compared
+           'Unmatched', the number of profiles of file_a and file_b
+                     that were not compared
+
+        Pixels outside the bands are not counted, nor those with a value
+        outside the range of a field (e.g. spare codes) in either file.
+        Rows are done chunk at a time.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+    from . import vfm_read
+    from . import vfm_expand
+
+    alt_edges = np.float64(alt_edges)
+    lat_edges = np.float64(lat_edges)
+    nalt, nlat = len(alt_edges) - 1, len(lat_edges) - 1
+
+    files = [file_a, file_b]
+    vfm = [vfm_read.vfm_read(f) for f in files]
+    if versions is None:
+        versions = [v['Version'] for v in vfm]
+    decoders = [_decoder(v) for v in versions]
+
+    [rows_a, rows_b] = _align(vfm[0], vfm[1], tol_time, tol_deg)
+
+    res = {'Counts':{}, 'Vmin':{}, 'ByteTxt':{},
+           'AltEdges':alt_edges, 'LatEdges':lat_edges, 'Versions':list(versions),
+           'Granules':1, 'Profiles':15*len(rows_a),
+           'Unmatched':[15*(v['Rows'] - len(rows_a)) for v in vfm]}
+    ranges = {}
+    for tag in fields:
+        meta = [_meta(d, tag) for d in decoders]
+        ranges[tag] = [[m[0], m[1]] for m in meta]
+        res['Vmin'][tag] = [m[0] for m in meta]
+        res['ByteTxt'][tag] = [m[2] for m in meta]
+        res['Counts'][tag] = np.zeros((nalt, nlat, meta[0][1], meta[1][1]), dtype=np.int64)
+
+    # altitude band of each level (the same in both versions)
+    ialt = np.searchsorted(alt_edges, vfm[1]['Altitude'], side='right') - 1
+    ialt[(ialt < 0) | (ialt >= nalt)] = -1
+
+    for i in range(0, len(rows_a), chunk):
+        ra, rb = rows_a[i:i+chunk], rows_b[i:i+chunk]
+        # latitude band of each expanded profile, from the second file
+        prof = (15*rb[:, None] + np.arange(15)[None, :]).ravel()
+        ilat = np.searchsorted(lat_edges, vfm[1]['Latitude'][prof], side='right') - 1
+        ilat[(ilat < 0) | (ilat >= nlat)] = -1
+        valid = (ialt[:, None] >= 0) & (ilat[None, :] >= 0)
+        band = (ialt[:, None]*nlat + ilat[None, :])[valid]
+
+        blocks = [vfm_expand.vfm_expand(vfm[0]['Data'][ra]),
+                  vfm_expand.vfm_expand(vfm[1]['Data'][rb])]
+        for tag in fields:
+            [[vmin_a, na], [vmin_b, nb]] = ranges[tag]
+            va = np.int64(decoders[0].vfm_type(blocks[0], tag)['Data'][valid]) - vmin_a
+            vb = np.int64(decoders[1].vfm_type(blocks[1], tag)['Data'][valid]) - vmin_b
+            # values without a name (spare codes) are not counted
+            ok = (va >= 0) & (va < na) & (vb >= 0) & (vb < nb)
+            code = ((band*na + va)*nb + vb)[ok]
+            res['Counts'][tag] += np.bincount(code, minlength=nalt*nlat*na*nb).reshape(nalt, nlat, na, nb)
+
+    return(res)
+
+
+def vfm_compare_batch(pairs, workers=None, **kwargs):
+    """VFM_COMPARE_BATCH   Confusion matrices of many granules
+
+        [res] = VFM_COMPARE_BATCH(pairs) runs vfm_compare() for each
+        [file_a, file_b] in pairs (see vfm_match), in a pool of workers
+        processes (default: number of cpus, workers=1 runs in the current
+        process), and merges the results (compare_merge). Other keywords
+        are passed to vfm_compare. A pair that fails is reported and
+        skipped, and listed in res['Failed'].
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    res = None
+    failed = []
+
+    def add(pair, r):
+        nonlocal res
+        if r is None:
+            failed.append(list(pair))
+        else:
+            res = compare_merge(res, r)
+
+    if workers == 1:
+        for pair in pairs:
+            add(pair, _compare(pair, kwargs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = {pool.submit(_compare, pair, kwargs): pair for pair in pairs}
+            for job in as_completed(jobs):
+                add(jobs[job], job.result())
+
+    if res is not None:
+        res['Failed'] = failed
+    return(res)
+
+
+def compare_merge(a, b):
+    """COMPARE_MERGE   Adds two results of vfm_compare
+
+        [res] = COMPARE_MERGE(a, b) returns the counts of a and b added,
+        e.g. from different granules, workers or runs. Either can be
+        None. They need the same fields, bands and versions.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import sys
+    import numpy as np
+
+    if a is None:
+        return(b)
+    if b is None:
+        return(a)
+
+    if (set(a['Counts']) != set(b['Counts'])) | (a['Versions'] != b['Versions']) | \
+       (not np.array_equal(a['AltEdges'], b['AltEdges'])) | \
+       (not np.array_equal(a['LatEdges'], b['LatEdges'])):
+        sys.exit('Cannot merge comparisons of different fields, bands or versions.')
+
+    res = dict(a)
+    res['Counts'] = {tag: a['Counts'][tag] + b['Counts'][tag] for tag in a['Counts']}
+    res['Granules'] = a['Granules'] + b['Granules']
+    res['Profiles'] = a['Profiles'] + b['Profiles']
+    res['Unmatched'] = [x + y for x, y in zip(a['Unmatched'], b['Unmatched'])]
+    if ('Failed' in a) | ('Failed' in b):
+        res['Failed'] = a.get('Failed', []) + b.get('Failed', [])
+    return(res)
+
+
+def compare_agreement(res, field, axis=None):
+    """COMPARE_AGREEMENT   Fraction of pixels classified the same
+
+        [frac] = COMPARE_AGREEMENT(res, field) returns the fraction of the
+        pixels of each altitude and latitude band (nalt x nlat) with the
+        same value of field in both versions, NaN for empty bands.
+        axis=0 (altitude), 1 (latitude) or (0, 1) adds the bands along
+        these axes first.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+
+    counts = res['Counts'][field]
+    if axis is not None:
+        counts = counts.sum(axis=axis, keepdims=True)
+    [vmin_a, vmin_b] = res['Vmin'][field]
+    [na, nb] = counts.shape[2:]
+    # pairs of the same value
+    a = np.arange(na)
+    b = a + vmin_a - vmin_b
+    ok = (b >= 0) & (b < nb)
+    same = counts[:, :, a[ok], b[ok]].sum(axis=-1)
+    total = counts.sum(axis=(2, 3))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return(np.where(total > 0, same / total, np.nan).squeeze())
+
+
+def compare_save(filen, res):
+    """Saves a result of vfm_compare (or of the merge of several) to the
+    .npz file filen: the counts of each field as 'Counts_<field>', the
+    bands, and the other items as JSON in 'Meta'"""
+    import json
+    import os
+    import numpy as np
+    arrays = {'Counts_' + tag: c for tag, c in res['Counts'].items()}
+    meta = {k: v for k, v in res.items() if k not in ['Counts', 'AltEdges', 'LatEdges']}
+    meta['Fields'] = list(res['Counts'])
+    with open(filen + '.tmp', 'wb') as f:
+        np.savez(f, Meta=np.array(json.dumps(meta)), AltEdges=res['AltEdges'],
+                 LatEdges=res['LatEdges'], **arrays)
+    os.replace(filen + '.tmp', filen)
+
+
+def compare_load(filen):
+    """Loads a result saved by compare_save"""
+    import json
+    import numpy as np
+    with np.load(filen) as f:
+        res = json.loads(str(f['Meta']))
+        res['Counts'] = {tag: f['Counts_' + tag] for tag in res.pop('Fields')}
+        res['AltEdges'] = f['AltEdges']
+        res['LatEdges'] = f['LatEdges']
+    return(res)
+
+
+def _align(vfm_a, vfm_b, tol_time, tol_deg):
+    # rows of a and b with the same profile time and position
+    import numpy as np
+
+    t = [v['Time'][::15] for v in [vfm_a, vfm_b]]
+    if (len(t[0]) == 0) | (len(t[1]) == 0):
+        return([np.zeros(0, dtype=np.int64)]*2)
+    order = np.argsort(t[1], kind='stable')
+    rb = order[_nearest(t[1][order], t[0])]
+    ra = np.arange(len(t[0]))
+
+    lat = [v['Latitude'][::15] for v in [vfm_a, vfm_b]]
+    lon = [v['Longitude'][::15] for v in [vfm_a, vfm_b]]
+    dlon = np.abs(np.mod(lon[0][ra] - lon[1][rb] + 180., 360.) - 180.)
+    keep = (np.abs(t[0][ra] - t[1][rb]) <= tol_time) & \
+        (np.abs(lat[0][ra] - lat[1][rb]) <= tol_deg) & (dlon <= tol_deg)
+    # each row of b once
+    [rb, first] = np.unique(np.where(keep, rb, -1), return_index=True)
+    first = first[rb >= 0]
+    return([ra[first], rb[rb >= 0]])
+
+
+def _nearest(t, x):
+    # index of the value of t (sorted) nearest to each x
+    import numpy as np
+    if len(t) == 1:
+        return(np.zeros(len(x), dtype=np.int64))
+    j = np.clip(np.searchsorted(t, x), 1, len(t) - 1)
+    return(np.where(np.abs(t[j - 1] - x) <= np.abs(t[j] - x), j - 1, j))
+
+
+def _decoder(version):
+    # vfm_type of a version of the product
+    if version == 3:
+        from . import vfm_type_v3 as vfm_type
+    else:
+        from . import vfm_type
+    return(vfm_type)
+
+
+def _meta(decoder, tag):
+    # Vmin, number of values and their names of a field
+    import numpy as np
+    meta = decoder.vfm_type(np.zeros(0, dtype=np.uint16), tag)
+    vmax = max(meta['Vmax'], meta['Vmin'] + len(meta['ByteTxt']) - 1)
+    return([meta['Vmin'], vmax - meta['Vmin'] + 1, meta['ByteTxt']])
+
+
+def _compare(pair, kwargs):
+    # one pair of granules, failures are reported but do not stop the batch
+    try:
+        return(vfm_compare(pair[0], pair[1], **kwargs))
+    except (Exception, SystemExit) as err:
+        print('Error: could not compare ' + pair[0] + ' and ' + pair[1] + ': ' + str(err))
+        return(None)
@@ -0,0 +1,123 @@
+def vfm_open_dataset(files, fields=['type'], rows=None):
+    """VFM_OPEN_DATASET   Opens many VFM granules as one lazy dataset
+
+        [ds] = VFM_OPEN_DATASET(files) returns an xarray Dataset with the
+        feature flags of all VFM files in files (a list, or a glob) as a
+        single (altitude x profile) curtain, without reading the data.
+        Granules are sorted by the start time in their file names (see
+        vfm_read.vfm_granule_time).
+
+        Each flag in fields (names as in vfm_type, default 'type') is a
+        Dask array with one chunk per granule, or per window of rows VFM
+        rows (15 x rows profiles) with rows=. Reading the rows of
+        Feature_Classification_Flags (vfm_read_rows), vfm_expand and
+        vfm_type are delayed and run per chunk when the data is needed;
+        the expanded chunk is shared by all fields. Only the
+        coordinates are read when opening:
+
+           'altitude', the VFM levels (km), of the first granule
+           'latitude', 'longitude', 'time' (datetime64), per profile
+           'granule', index of the granule of each profile in ds.attrs['files']
+
+        The attributes of each flag are those returned by vfm_type
+        (FieldDescription, Vmin, Vmax, ByteTxt). V3 granules are decoded
+        with vfm_type_v3, and their flags have the attributes and data
+        types of V3. Since they differ, all granules must be of the same
+        version (open V3 and V4 granules as two datasets).
+
+        Reductions run out of core and in parallel with the Dask
+        scheduler, e.g. the cloud occurrence frequency per level:
+
+            ds = vfm_open_dataset('data/*.hdf')
+            freq = (ds['type'] == 2).mean('profile').compute()
+
+        Requires xarray and dask.
+
+        History:
+           2026-oct-19 Attributes of the product version, rejects mixed
+                       versions and empty file lists.
+
+           2026-oct-19 First version
+
+    """
+
+    import glob
+    import sys
+    import numpy as np
+    import dask
+    import dask.array as da
+    import xarray as xr
+    from . import vfm_read
+
+    if isinstance(files, str):
+        files = glob.glob(files)
+    if len(files) == 0:
+        sys.exit('No VFM files to open.')
+    # ISO times sort as strings, unknown start times go last
+    t0 = {f: vfm_read.vfm_granule_time(f) for f in files}
+    files = sorted(files, key=lambda f: (t0[f] is None, str(t0[f]), f))
+
+    coords = [vfm_read.vfm_read(filen, data=False) for filen in files]
+    nz = len(coords[0]['Altitude'])
+    versions = sorted(set(c['Version'] for c in coords))
+    if len(versions) > 1:
+        sys.exit('Granules of versions ' + str(versions) + ' have different flags, '
+                 'open each version separately.')
+
+    load = dask.delayed(_load, pure=True)
+    decode = dask.delayed(_decode, pure=True)
+    meta = {tag: _meta(tag, versions[0]) for tag in fields}
+
+    chunks = {tag: [] for tag in fields}
+    for filen, c in zip(files, coords):
+        step = c['Rows'] if rows is None else rows
+        for start in range(0, c['Rows'], step):
+            stop = min(start + step, c['Rows'])
+            block = load(filen, start, stop)
+            for tag in fields:
+                chunks[tag].append(da.from_delayed(decode(block, tag, c['Version']),
+                                                   shape=(nz, 15*(stop-start)),
+                                                   dtype=meta[tag]['Data'].dtype))
+
+    data_vars = {}
+    for tag in fields:
+        attrs = {k: meta[tag][k] for k in ['FieldDescription', 'Vmin', 'Vmax', 'ByteTxt']}
+        data_vars[tag] = (('altitude', 'profile'), da.concatenate(chunks[tag], axis=1), attrs)
+
+    cat = lambda k: np.concatenate([c[k] for c in coords])
+    ds = xr.Dataset(data_vars, coords={
+        'altitude':('altitude', coords[0]['Altitude'], {'units':'km'}),
+        'latitude':('profile', cat('Latitude')),
+        'longitude':('profile', cat('Longitude')),
+        'time':('profile', vfm_read.tai_to_datetime(cat('Time'))),
+        'granule':('profile', np.repeat(np.arange(len(files)),
+                                        [len(c['Latitude']) for c in coords]))})
+    ds.attrs['files'] = list(files)
+
+    return(ds)
+
+
+def _load(filen, start, stop):
+    # expanded rows start to stop-1 of a granule
+    from . import vfm_read
+    from . import vfm_expand
+    return(vfm_expand.vfm_expand(vfm_read.vfm_read_rows(filen, start, stop)))
+
+
+def _decode(block, tag, version):
+    # one feature flag of an expanded chunk
+    if version == 3:
+        from . import vfm_type_v3 as vfm_type
+    else:
+        from . import vfm_type
+    return(vfm_type.vfm_type(block, tag)['Data'])
+
+
+def _meta(tag, version):
+    # attributes and data type of a flag, from an empty block
+    import numpy as np
+    if version == 3:
+        from . import vfm_type_v3 as vfm_type
+    else:
+        from . import vfm_type
+    return(vfm_type.vfm_type(np.zeros((0, 0), dtype=np.uint16), tag))
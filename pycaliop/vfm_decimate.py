@@ -0,0 +1,149 @@
+# Priority of the flag values when several pixels are merged into one,
+# from the highest to the lowest. A feature (e.g. a thin cloud) wins over
+# the clear air around it, so it is not lost when the curtain is reduced.
+# Fields not listed here use a majority vote.
+PRIORITY = {
+    'Feature Type': [2, 4, 3, 5, 7, 6, 1, 0],
+}
+
+
+def vfm_decimate(vfm, x, y, nx, ny, xlim=None, ylim=None, method='auto'):
+    """VFM_DECIMATE   Reduces a VFM feature to the display resolution
+
+        [vfm_out, x_out, y_out] = VFM_DECIMATE(vfm, x, y, nx, ny) merges
+        the pixels of vfm['Data'] that fall on the same screen pixel,
+        when the curtain is drawn on an axis nx pixels wide and ny
+        pixels tall. x (one per profile) and y (one per level) are the
+        centers of the data pixels, and x_out, y_out are the centers of
+        the merged pixels. The limits of the axis default to those of x
+        and y, and can be given with xlim=[x0,x1] and ylim=[y0,y1].
+
+        vfm_out is a copy of vfm, with the reduced 'Data'. If the data
+        already fits in the axis, vfm is returned unchanged.
+
+        VFM_DECIMATE(..., method='auto') chooses how the merged pixels
+        are computed, see vfm_reduce().
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+    from . import vfm_stats
+
+    t0 = vfm_stats.start()
+    x = np.float64(np.ravel(x))
+    y = np.float64(np.ravel(y))
+
+    if xlim is None:
+        xlim = [np.min(x), np.max(x)]
+    if ylim is None:
+        ylim = [np.min(y), np.max(y)]
+
+    rstart = decimate_index(y, ny, ylim)
+    cstart = decimate_index(x, nx, xlim)
+
+    if (len(rstart) == len(y)) & (len(cstart) == len(x)):
+        return([vfm, x, y])
+
+    vfm_out = dict(vfm)
+    vfm_out['Data'] = vfm_reduce(vfm, rstart, cstart, method=method)
+
+    x_out = np.add.reduceat(x, cstart) / np.diff(np.append(cstart, len(x)))
+    y_out = np.add.reduceat(y, rstart) / np.diff(np.append(rstart, len(y)))
+    vfm_stats.stop(t0, 'decimate', nbytes=vfm_out['Data'].nbytes)
+
+    return([vfm_out, x_out, y_out])
+
+
+def decimate_index(c, npix, lim):
+    """DECIMATE_INDEX   Groups coordinates by screen pixel
+
+        [start] = DECIMATE_INDEX(c, npix, lim) returns the index where
+        each group of consecutive coordinates c that fall on the same
+        pixel begins, for an axis with npix pixels spanning lim=[c0,c1].
+        The result can be used with np.ufunc.reduceat.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+
+    c = np.ravel(c)
+    width = abs(lim[1] - lim[0])
+    if (len(c) < 2) | (width == 0) | (npix < 1):
+        return(np.arange(len(c)))
+
+    pix = np.floor((c - min(lim)) / width * npix)
+    return(np.concatenate([[0], np.flatnonzero(np.diff(pix) != 0) + 1]))
+
+
+def vfm_reduce(vfm, rstart, cstart, method='auto'):
+    """VFM_REDUCE   Merges blocks of VFM pixels preserving categories
+
+        [data] = VFM_REDUCE(vfm, rstart, cstart) merges the blocks of
+        vfm['Data'] starting at the rows rstart and columns cstart (as
+        returned by decimate_index) into a single value each. Because
+        VFM flags are categories, they are never averaged:
+
+           'priority', the value with the highest priority present in
+                       the block wins (see PRIORITY).
+           'majority', the most frequent value in the block wins, but
+                       the 'N/A' value (regions without this kind of
+                       feature) only wins if the block has nothing else.
+           'auto',     (default) 'priority' for fields listed in
+                       PRIORITY, 'majority' for the others.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+    import sys
+
+    data = vfm['Data']
+    # some fields have more labels than Vmin..Vmax (e.g. Feature Type QA)
+    vmin = vfm['Vmin']
+    vmax = max(vfm['Vmax'], vmin + len(vfm['ByteTxt']) - 1)
+    nval = vmax - vmin + 1
+    ind = np.clip(data, vmin, vmax) - vmin
+
+    if method == 'auto':
+        if vfm['FieldDescription'] in PRIORITY:
+            method = 'priority'
+        else:
+            method = 'majority'
+
+    if method == 'priority':
+        order = PRIORITY.get(vfm['FieldDescription'], range(vmax, vmin-1, -1))
+        # rank 0 is the lowest priority
+        rank = np.zeros(nval, dtype=np.uint8)
+        for r, v in enumerate(reversed(list(order))):
+            rank[v - vmin] = r
+        inv = np.zeros(nval, dtype=data.dtype)
+        inv[rank] = np.arange(vmin, vmax+1)
+
+        out = np.take(rank, ind)
+        out = np.maximum.reduceat(out, cstart, axis=1)
+        out = np.maximum.reduceat(out, rstart, axis=0)
+        return(np.take(inv, out))
+
+    elif method == 'majority':
+        count = np.zeros((nval, len(rstart), len(cstart)), dtype=np.int32)
+        for i in range(nval):
+            c = np.add.reduceat(np.int32(ind == i), cstart, axis=1)
+            count[i] = np.add.reduceat(c, rstart, axis=0)
+
+        if vfm['ByteTxt'][0] == 'N/A':
+            # N/A only when there is nothing else
+            count[0] = np.where(count[1:].sum(axis=0) > 0, -1, count[0])
+
+        out = np.argmax(count, axis=0) + vmin
+        return(out.astype(data.dtype))
+
+    else:
+        sys.exit('Unknown decimation method: ' + str(method))
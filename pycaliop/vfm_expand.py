@@ -20,6 +20,10 @@ def vfm_expand(vfm_rows):
        shared on the Calipso website (written by Ralph Kuehn in 2005). 
       
        History 
+          2026-oct-19 Records its time in vfm_stats (stage 'expand').
+
+          2026-oct-19 Removed np.int, which no longer exists in numpy.
+
           2021-mar-09 Optimized version 
     
           2021-mar-07 First version, looking at Calipso Data user's guide
@@ -30,7 +34,10 @@ def vfm_expand(vfm_rows):
 
     import sys
     import numpy as np
-    
+    from . import vfm_stats
+
+    t0 = vfm_stats.start()
+
     # Check dimensions, it should be: ntimes x 5515
     if vfm_rows.ndim != 2:
         sys.exit('Input data should have 2 dimensions.')
@@ -59,12 +66,13 @@ def vfm_expand(vfm_rows):
   
         # the 15 compressed profiles vary (in time) faster than ntimes
         for j in range(15):
-            vfm_block[i, j,    :55 ] = bk1[np.int(np.floor(j/5)), :]
-            vfm_block[i, j,  55:255] = bk2[np.int(np.floor(j/3)), :]
+            vfm_block[i, j,    :55 ] = bk1[j//5, :]
+            vfm_block[i, j,  55:255] = bk2[j//3, :]
             vfm_block[i, j, 255:   ] = bk3[j, :]
 
     # Last 2 dimensions are "times", so let's make just one
     vfm_block = np.reshape(vfm_block, [15*ntimes, 545])
+    vfm_stats.stop(t0, 'expand', nbytes=vfm_block.nbytes)
 
     return(vfm_block.transpose())
 #
@@ -0,0 +1,275 @@
+# Regridding indexes already built, see vfm_regrid_index()
+_INDEX = {}
+# Level edges already computed, see vfm_level_edges()
+_EDGES = {}
+
+
+def vfm_altitude():
+    """VFM_ALTITUDE   Altitudes of the VFM levels
+
+        [alt] = VFM_ALTITUDE() returns the altitude (km) of the center of
+        the 545 VFM levels, from the top: 55 levels of 180m above 20.2km,
+        200 levels of 60m above 8.2km and 290 levels of 30m below. These
+        are the Lidar_Data_Altitudes of the files, between -0.5 and 30km.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+
+    return(np.concatenate([29.97595215 - 0.17962837*np.arange(55),
+                           20.15623474 - 0.05987549*np.arange(200),
+                            8.19594002 - 0.02993774*np.arange(290)]))
+
+
+def vfm_level_edges(alt=None):
+    """VFM_LEVEL_EDGES   Altitude of the edges of the VFM levels
+
+        [top, bottom] = VFM_LEVEL_EDGES(alt) returns the altitude (km) of
+        the top and bottom of each level, for the level centers alt (as
+        returned by vfm_read, from the top). By default alt is that of
+        the VFM files (see vfm_altitude).
+
+        Levels are 180m thick above 20.2km, 60m above 8.2km and 30m
+        below. Each level takes the spacing of its own region (the
+        distance to the next center, or to the previous one for the last
+        level of a region), and the edge between two levels is half way
+        between the bottom of the first one and the top of the second.
+
+        The edges are kept in memory and reused by later calls with the
+        same levels; the arrays returned are read-only.
+
+        History:
+           2026-oct-19 Edges kept in memory, default levels from
+                       vfm_altitude.
+
+           2026-oct-19 First version
+
+    """
+
+    return(_edges(alt)[:2])
+
+
+def vfm_alt2level(z, alt=None):
+    """VFM_ALT2LEVEL   VFM level of altitudes
+
+        [level] = VFM_ALT2LEVEL(z, alt) returns the index of the VFM level
+        (0 at the top, as in vfm_type data) that contains each altitude
+        in z (km, any shape), or -1 if it is outside the VFM. alt is as
+        in vfm_level_edges.
+
+        History:
+           2026-oct-19 Edges kept in memory, not computed at each call.
+
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+
+    [top, bottom, asc] = _edges(alt)
+    z = np.asarray(z, dtype=np.float64)
+    j = np.searchsorted(asc, z, side='right') - 1
+    n = len(top)
+    return(np.where((j >= 0) & (j < n), n - 1 - j, -1))
+
+
+def vfm_level2alt(level, alt=None):
+    """VFM_LEVEL2ALT   Altitude of VFM levels
+
+        [z] = VFM_LEVEL2ALT(level, alt) returns the altitude (km) of the
+        center of each level in level (any shape, 0 at the top), NaN for
+        levels outside 0..544. alt is as in vfm_level_edges.
+
+        History:
+           2026-oct-19 Default levels from vfm_altitude.
+
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+
+    if alt is None:
+        alt = vfm_altitude()
+    alt = np.ravel(np.float64(alt))
+    level = np.asarray(level)
+    valid = (level >= 0) & (level < len(alt))
+    return(np.where(valid, alt[np.where(valid, level, 0)], np.nan))
+
+
+def vfm_regrid_index(edges, alt=None):
+    """VFM_REGRID_INDEX   Index to regrid VFM levels on another grid
+
+        [index] = VFM_REGRID_INDEX(edges, alt) computes the overlap (km)
+        of each VFM level (alt as in vfm_level_edges) with each cell of
+        the vertical grid with these edges (km, ascending or descending,
+        e.g. np.arange(0, 20.01, 0.25)). index is a dictionary with one
+        entry per pair of overlapping level and cell, sorted by cell:
+
+           'Level', 'Cell', the level and the cell of each pair
+           'Weight', their overlap (km)
+           'Start', the first pair of each cell with data
+           'Cells', the cells with data
+           'Covered', the thickness of each cell with VFM data (km)
+           'Edges', 'Altitude', the edges and centers of the grid
+
+        Indexes are kept in memory and reused by later calls with the
+        same grid, e.g. for all granules regridded by vfm_regrid.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+
+    edges = np.ravel(np.float64(edges))
+    key = (None if alt is None else tuple(np.round(np.ravel(alt), 5)),
+           tuple(np.round(edges, 6)))
+    if key in _INDEX:
+        return(_INDEX[key])
+
+    [top, bottom] = vfm_level_edges(alt)
+    ncell = len(edges) - 1
+    lo = np.minimum(edges[:-1], edges[1:])
+    hi = np.maximum(edges[:-1], edges[1:])
+
+    overlap = np.minimum(top[None, :], hi[:, None]) - np.maximum(bottom[None, :], lo[:, None])
+    [cell, level] = np.nonzero(overlap > 0)
+    weight = overlap[cell, level]
+
+    cells = np.unique(cell)
+    index = {'Level':level, 'Cell':cell, 'Weight':weight,
+             'Start':np.searchsorted(cell, cells), 'Cells':cells,
+             'Covered':np.bincount(cell, weights=weight, minlength=ncell),
+             'Edges':edges, 'Altitude':(edges[:-1] + edges[1:])/2}
+
+    _INDEX[key] = index
+    return(index)
+
+
+def vfm_regrid(vfm, edges, alt=None, method='auto'):
+    """VFM_REGRID   Resamples a VFM feature on another vertical grid
+
+        [out] = VFM_REGRID(vfm, edges) resamples the levels of vfm (as
+        returned by vfm_type, nzlev x total_times) on the cells of the
+        vertical grid with these edges (km), using the overlap of the
+        levels with the cells (see vfm_regrid_index, alt is the altitude
+        of the VFM levels). Flags are categories and are never averaged:
+
+           'priority', the value with the highest priority found in the
+                       cell wins (see vfm_decimate.PRIORITY)
+           'majority', the value covering most of the cell wins, but
+                       'N/A' only when there is nothing else
+           'auto',     (default) 'priority' for fields listed in
+                       vfm_decimate.PRIORITY, 'majority' for the others
+           'fraction', the fraction of the cell covered by each value
+
+        out is a copy of vfm with 'Data' (ncell x total_times, or nval x
+        ncell x total_times float32 fractions for 'fraction', the values
+        going from Vmin), and 'Altitude' and 'Edges' of the grid. Cells
+        without VFM data get Vmin (NaN fractions).
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+    import sys
+    from . import vfm_decimate
+
+    index = vfm_regrid_index(edges, alt)
+    data = vfm['Data']
+    vmin = vfm['Vmin']
+    vmax = max(vfm['Vmax'], vmin + len(vfm['ByteTxt']) - 1)
+    nval = vmax - vmin + 1
+    ncell = len(index['Edges']) - 1
+    nt = data.shape[1]
+
+    # values of the levels of each pair, grouped by cell
+    ind = np.clip(data[index['Level']], vmin, vmax) - vmin
+    start = index['Start']
+    cells = index['Cells']
+
+    if method == 'auto':
+        if vfm['FieldDescription'] in vfm_decimate.PRIORITY:
+            method = 'priority'
+        else:
+            method = 'majority'
+
+    out = dict(vfm)
+    out['Altitude'] = index['Altitude']
+    out['Edges'] = index['Edges']
+
+    if method == 'priority':
+        order = vfm_decimate.PRIORITY.get(vfm['FieldDescription'], range(vmax, vmin-1, -1))
+        # rank 0 is the lowest priority
+        rank = np.zeros(nval, dtype=np.uint8)
+        for r, v in enumerate(reversed(list(order))):
+            rank[v - vmin] = r
+        inv = np.zeros(nval, dtype=data.dtype)
+        inv[rank] = np.arange(vmin, vmax+1)
+
+        best = np.maximum.reduceat(np.take(rank, ind), start, axis=0)
+        out['Data'] = np.full((ncell, nt), vmin, dtype=data.dtype)
+        out['Data'][cells] = np.take(inv, best)
+        return(out)
+
+    # thickness of the cell covered by each value
+    w = np.float32(index['Weight'])[:, None]
+    cover = np.zeros((nval, len(cells), nt), dtype=np.float32)
+    for i in range(nval):
+        cover[i] = np.add.reduceat(w*(ind == i), start, axis=0)
+
+    if method == 'fraction':
+        out['Data'] = np.full((nval, ncell, nt), np.nan, dtype=np.float32)
+        out['Data'][:, cells] = cover / np.float32(index['Covered'][cells])[None, :, None]
+        return(out)
+
+    elif method == 'majority':
+        if vfm['ByteTxt'][0] == 'N/A':
+            # N/A only when there is nothing else
+            cover[0] = np.where(cover[1:].sum(axis=0) > 0, -1, cover[0])
+        out['Data'] = np.full((ncell, nt), vmin, dtype=data.dtype)
+        out['Data'][cells] = np.argmax(cover, axis=0) + vmin
+        return(out)
+
+    else:
+        sys.exit('Unknown regridding method: ' + str(method))
+
+
+def _edges(alt):
+    # top, bottom and ascending edges of the levels, see vfm_level_edges
+    import numpy as np
+
+    key = None if alt is None else np.round(np.float64(np.ravel(alt)), 5).tobytes()
+    if key in _EDGES:
+        return(_EDGES[key])
+
+    if alt is None:
+        alt = vfm_altitude()
+    alt = np.ravel(np.float64(alt))
+
+    d = alt[:-1] - alt[1:]
+    # spacing below each level, and above it where that is the same as
+    # two levels above (i.e. not across a change of spacing)
+    t = np.append(d, d[-1])
+    same = np.zeros(len(alt), dtype=bool)
+    same[2:] = np.isclose(d[1:], d[:-1], rtol=1e-3)
+    same[-1] = True
+    t[same] = d[np.flatnonzero(same) - 1]
+
+    edge = ((alt[:-1] - t[:-1]/2) + (alt[1:] + t[1:]/2))/2
+    top = np.append(alt[0] + t[0]/2, edge)
+    bottom = np.append(edge, alt[-1] - t[-1]/2)
+    # edges from the bottom, for vfm_alt2level
+    asc = np.append(bottom[::-1], top[0])
+    for a in [top, bottom, asc]:
+        a.flags.writeable = False
+
+    _EDGES[key] = [top, bottom, asc]
+    return(_EDGES[key])
@@ -0,0 +1,165 @@
+"""In-memory cache of granules, for interactive sessions
+
+    from pycaliop import vfm_lru
+    for tag in ['type', 'phase', 'cloud']:
+        vfmflag = vfm_lru.vfm_load(filen, tag)
+        vfm_plot.vfm_plot(vfmflag, ...)
+
+reads and expands the granule once, and decodes each flag once. The
+rows read from the file, the expanded blocks and the decoded flags are
+kept in a least recently used cache limited to a number of bytes
+(set_budget(), or PYCALIOP_MEMORY, default 1 GB) rather than of
+entries. Entries pushed out of the budget are still found, without
+reading or decoding again, while the caller holds on to their data
+(weak references).
+
+Cached arrays are read-only, since they are shared by all callers; copy
+them to modify them. Entries of a file that changed are not used.
+
+History:
+   2026-oct-19 First version
+
+"""
+
+import collections
+import os
+import threading
+import weakref
+
+_BUDGET = int(float(os.environ.get('PYCALIOP_MEMORY', 2**30)))
+_CACHE = collections.OrderedDict()
+_SIZES = {}
+# entries out of the budget: weak reference to their data, and the rest
+_WEAK = {}
+_STATS = {'hits':0, 'weak_hits':0, 'misses':0, 'evictions':0}
+_LOCK = threading.RLock()
+
+
+def vfm_load(filen, field=None, version=None):
+    """VFM_LOAD   Reads or decodes a VFM granule, through the cache
+
+        [out] = VFM_LOAD(filen) returns vfm_read(filen), the rows of the
+        file and their coordinates.
+
+        [out] = VFM_LOAD(filen, 'block') returns the expanded block,
+        vfm_expand(vfm_read(filen)['Data']).
+
+        [out] = VFM_LOAD(filen, field) returns the flag field of the
+        expanded block, as vfm_type(block, field). version (default
+        from the file name, see vfm_version) selects vfm_type_v3 for 3.
+
+        Each of them is taken from the cache if it is there, and put in
+        the cache otherwise, with what was needed to compute it.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    from . import vfm_read
+
+    st = os.stat(filen)
+    granule = (os.path.abspath(filen), st.st_size, st.st_mtime_ns)
+
+    if field is None:
+        return(_get((granule, 'rows'), lambda: vfm_read.vfm_read(filen)))
+
+    if field == 'block':
+        def expand():
+            from . import vfm_expand
+            return(vfm_expand.vfm_expand(vfm_load(filen)['Data']))
+        return(_get((granule, 'block'), expand))
+
+    if version is None:
+        version = vfm_read.vfm_version(filen)
+
+    def decode():
+        if version == 3:
+            from . import vfm_type_v3 as vfm_type
+        else:
+            from . import vfm_type
+        return(vfm_type.vfm_type(vfm_load(filen, 'block'), field))
+    return(_get((granule, field.lower(), version), decode))
+
+
+def set_budget(nbytes):
+    """Sets the size of the cache (bytes), evicting entries if needed"""
+    global _BUDGET
+    with _LOCK:
+        _BUDGET = int(nbytes)
+        _evict()
+
+
+def clear():
+    """Empties the cache"""
+    with _LOCK:
+        _CACHE.clear()
+        _SIZES.clear()
+        _WEAK.clear()
+
+
+def cache_info():
+    """Hits, weak hits, misses, evictions, entries and bytes used"""
+    with _LOCK:
+        info = dict(_STATS)
+        info.update(entries=len(_CACHE), bytes=sum(_SIZES.values()), budget=_BUDGET)
+    return(info)
+
+
+def _get(key, compute):
+    # value of key, from the cache, from a weak reference, or computed
+    with _LOCK:
+        if key in _CACHE:
+            _CACHE.move_to_end(key)
+            _STATS['hits'] += 1
+            return(_copy(_CACHE[key]))
+        if key in _WEAK:
+            [ref, rest] = _WEAK.pop(key)
+            data = ref()
+            if data is not None:
+                _STATS['weak_hits'] += 1
+                value = data if rest is None else dict(rest, Data=data)
+                _put(key, value)
+                return(_copy(value))
+
+    # outside the lock, computing may take a while (and use the cache)
+    value = compute()
+    with _LOCK:
+        _STATS['misses'] += 1
+        _put(key, value)
+    return(_copy(value))
+
+
+def _put(key, value):
+    # adds value to the cache, read-only
+    import numpy as np
+    arrays = [value] if isinstance(value, np.ndarray) else \
+        [v for v in value.values() if isinstance(v, np.ndarray)]
+    for a in arrays:
+        a.setflags(write=False)
+    _CACHE[key] = value
+    _CACHE.move_to_end(key)
+    _SIZES[key] = sum(a.nbytes for a in arrays)
+    _evict()
+
+
+def _evict():
+    # least recently used entries out of the budget, keep a weak reference
+    while (sum(_SIZES.values()) > _BUDGET) & (len(_CACHE) > 0):
+        [key, value] = _CACHE.popitem(last=False)
+        del _SIZES[key]
+        _STATS['evictions'] += 1
+        if isinstance(value, dict):
+            rest = {k: v for k, v in value.items() if k != 'Data'}
+            _WEAK[key] = [weakref.ref(value['Data']), rest]
+        else:
+            _WEAK[key] = [weakref.ref(value), None]
+
+    # forget the references that died
+    for key in [k for k, (ref, rest) in _WEAK.items() if ref() is None]:
+        del _WEAK[key]
+
+
+def _copy(value):
+    # callers can change the dictionary, not the arrays
+    return(dict(value) if isinstance(value, dict) else value)
@@ -0,0 +1,175 @@
+"""Memory-mapped reads of HDF4 scientific datasets
+
+    from pycaliop import vfm_mmap
+    data = vfm_mmap.vfm_read_mmap(filen, 1000, 2000)
+
+returns rows 1000 to 1999 of Feature_Classification_Flags as a view of
+the file (np.memmap) instead of a copy: nothing is read until the
+values are used, and then only the pages of those rows. pyhdf's get()
+always reads and copies the whole selection.
+
+This is possible when the dataset is stored uncompressed and in one
+piece, as in the VFM files. Its position is found in the data
+descriptors (DD) of the HDF4 file: the descriptor of the dataset (NDG)
+points to its data element, whose offset and length give the layout.
+The layout of each file is kept in memory. Compressed, chunked or
+appendable (linked blocks) datasets are special elements in HDF4, and
+are read with pyhdf instead.
+
+The view has the byte order of the file (big-endian for VFM files);
+NumPy converts the values when it uses them, and vfm_expand and
+vfm_type accept it as it is.
+
+History:
+   2026-oct-19 First version
+
+"""
+
+# layout of the datasets already looked at, see vfm_sds_layout()
+_LAYOUT = {}
+
+# HDF4 tags, number types and the special element bit
+_DFTAG_SD = 702
+_DFTAG_SDG = 700
+_DFTAG_NDG = 720
+_SPECIAL = 0x4000
+_LITEND = 0x4000
+_NUMBER_TYPES = {5:'f4', 6:'f8', 20:'i1', 21:'u1', 22:'i2', 23:'u2',
+                 24:'i4', 25:'u4', 26:'i8', 27:'u8'}
+
+
+def vfm_sds_layout(filen, name='Feature_Classification_Flags'):
+    """VFM_SDS_LAYOUT   Position of a dataset in an HDF4 file
+
+        [layout] = VFM_SDS_LAYOUT(filen, name) returns the offset (bytes
+        from the start of the file), shape and dtype (with its byte
+        order) of the dataset name of the HDF4 file filen, as a
+        dictionary, or None if the dataset is not stored in one
+        uncompressed piece and cannot be mapped.
+
+        The layout is kept in memory, and found again only if the file
+        changes.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import os
+    import numpy as np
+    from pyhdf import SD
+
+    st = os.stat(filen)
+    key = (os.path.abspath(filen), st.st_size, st.st_mtime_ns, name)
+    if key in _LAYOUT:
+        return(_LAYOUT[key])
+
+    h4sd = SD.SD(filen)
+    sds = h4sd.select(name)
+    [sname, rank, dims, ntype, nattrs] = sds.info()
+    ref = sds.ref()
+    sds.endaccess()
+    h4sd.end()
+    shape = [dims] if rank == 1 else list(dims)
+
+    layout = None
+    dtype = _NUMBER_TYPES.get(ntype & ~_LITEND)
+    if dtype is not None:
+        dtype = np.dtype(('<' if ntype & _LITEND else '>') + dtype)
+        with open(filen, 'rb') as f:
+            dds = _read_dds(f)
+            data = _data_element(f, dds, ref)
+        if (data is not None) and (data[0] & _SPECIAL == 0) and \
+           (data[3] == int(np.prod(shape))*dtype.itemsize):
+            layout = {'Offset':data[2], 'Shape':shape, 'Dtype':dtype}
+
+    _LAYOUT[key] = layout
+    return(layout)
+
+
+def vfm_read_mmap(filen, start=0, stop=None, name='Feature_Classification_Flags'):
+    """VFM_READ_MMAP   Rows of an HDF4 dataset, without copying
+
+        [data] = VFM_READ_MMAP(filen, start, stop) returns the rows start
+        to stop-1 (stop=None for all) of the dataset name of the HDF4
+        file filen. If the dataset can be mapped (see vfm_sds_layout),
+        data is a read-only view of the file (np.memmap) and only the
+        pages of the rows used are ever read; otherwise the rows are
+        read with pyhdf, as in vfm_read_rows.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+    from . import vfm_stats
+
+    layout = vfm_sds_layout(filen, name)
+    if layout is None:
+        return(_read_sds(filen, name, start, stop))
+
+    t0 = vfm_stats.start()
+    data = np.memmap(filen, dtype=layout['Dtype'], mode='r', offset=layout['Offset'],
+                     shape=tuple(layout['Shape']))
+    data = data[start:stop]
+    # nothing is read yet
+    vfm_stats.stop(t0, 'read:mmap')
+
+    return(data)
+
+
+def _read_dds(f):
+    # all data descriptors of the file: [tag, ref, offset, length]
+    import struct
+    import sys
+
+    if f.read(4) != b'\x0e\x03\x13\x01':
+        sys.exit('Not an HDF4 file.')
+    dds = []
+    block = 4
+    while block != 0:
+        f.seek(block)
+        [ndds, block] = struct.unpack('>hi', f.read(6))
+        raw = f.read(12*ndds)
+        dds.extend(list(dd) for dd in struct.iter_unpack('>HHii', raw))
+    return(dds)
+
+
+def _data_element(f, dds, ref):
+    # descriptor of the data of the dataset with reference ref, None if
+    # it has no data written
+    import struct
+
+    find = {(dd[0], dd[1]): dd for dd in dds}
+    group = find.get((_DFTAG_NDG, ref), find.get((_DFTAG_SDG, ref)))
+    if group is None:
+        return(None)
+    f.seek(group[2])
+    raw = f.read(group[3] - group[3] % 4)
+    for [tag, r] in struct.iter_unpack('>HH', raw):
+        if (tag & ~_SPECIAL) == _DFTAG_SD:
+            return(find.get((tag, r)))
+    return(None)
+
+
+def _read_sds(filen, name, start, stop):
+    # rows of a dataset read with pyhdf
+    from pyhdf import SD
+    from . import vfm_stats
+
+    t0 = vfm_stats.start()
+    h4sd = SD.SD(filen)
+    sds = h4sd.select(name)
+    dims = sds.info()[2]
+    dims = [dims] if isinstance(dims, int) else list(dims)
+    if stop is None:
+        stop = dims[0]
+    stop = min(stop, dims[0])
+    data = sds.get(start=[start] + [0]*(len(dims) - 1),
+                   count=[max(stop - start, 0)] + dims[1:])
+    sds.endaccess()
+    h4sd.end()
+    vfm_stats.stop(t0, 'read', nbytes=data.nbytes, bytes_read=data.nbytes)
+
+    return(data)
@@ -0,0 +1,391 @@
+"""Staged processing of a stream of granules, with asyncio
+
+    from pycaliop import vfm_pipeline
+    stages = vfm_pipeline.vfm_stages('out', fields=['type', 'phase'])
+    summary = vfm_pipeline.vfm_pipeline(glob.glob('data/*.hdf'), stages)
+
+runs each granule through a list of stages (by default read, decode,
+aggregate and render) that work at the same time on different granules.
+Each stage takes its input from a bounded asyncio.Queue and puts its
+output in the queue of the next stage, so a slow stage (e.g. render)
+fills its queue and stops the stages before it (down to reading) instead
+of letting the granules pile up in memory: at most maxsize granules wait
+between two stages, whatever the rate at which they arrive.
+
+The functions of the stages (pyhdf reads, NumPy kernels, PNG encoding)
+run in a pool of threads or processes per stage, with as many workers as
+the stage asks for. The source can be a list of files or an asynchronous
+iterator, e.g. watch() for files arriving in a directory, and the
+pipeline then runs until the source ends.
+
+The pipeline reports, per stage, the granules in and out, the failures,
+the time busy and the time blocked on a full queue (backpressure), the
+queue depth and the throughput, every interval seconds while it runs
+and in the summary it returns.
+
+History:
+   2026-oct-19 Stages of vfm_stages are module functions (picklable),
+               decoding in processes, grid totals per product version.
+
+   2026-oct-19 First version
+
+"""
+
+import asyncio
+import os
+import time
+
+# end of the stream, passed down the queues
+_END = object()
+
+
+class stage:
+    """STAGE   A stage of the pipeline
+
+        stage(name, func, workers=1, executor='thread', close=None,
+              on_error='drop')
+
+    calls func(item) for each item from the previous stage (or the
+    source), with up to workers calls at the same time. func returns the
+    item of the next stage, or None to drop it. executor is 'thread' or
+    'process' for a pool of workers threads or processes (func and the
+    items then need to be picklable), or None to call func in the event
+    loop (for quick functions, or coroutines). close() is called, in the
+    same executor, once all items went through the stage, e.g. to save
+    what the stage accumulated. When func fails on an item, the item is
+    dropped (on_error='drop'), or passed on unchanged to the next stage
+    (on_error='pass'), e.g. for a stage whose output is optional.
+
+    """
+
+    def __init__(self, name, func, workers=1, executor='thread', close=None,
+                 on_error='drop'):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.executor = executor
+        self.close = close
+        self.on_error = on_error
+
+
+def vfm_pipeline(source, stages, maxsize=2, report=None, interval=10.):
+    """VFM_PIPELINE   Runs granules through a pipeline of stages
+
+        [summary] = VFM_PIPELINE(source, stages) runs run_pipeline() in
+        a new event loop and returns its summary. See run_pipeline.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    return(asyncio.run(run_pipeline(source, stages, maxsize=maxsize, report=report,
+                                    interval=interval)))
+
+
+async def run_pipeline(source, stages, maxsize=2, report=None, interval=10.):
+    """RUN_PIPELINE   Runs granules through a pipeline of stages
+
+        [summary] = await RUN_PIPELINE(source, stages) passes each item of
+        source (an iterable, or an asynchronous iterable such as watch())
+        through the stages (a list of stage), each stage working on the
+        items in its queue while the others work on theirs. There are at
+        most maxsize items waiting in the queue of each stage, and a stage
+        waits (blocked) when the queue of the next one is full.
+
+        report(summary) is called every interval seconds while the
+        pipeline runs (default: log_pipeline). summary is a dictionary
+        with 'seconds', 'errors' ([stage, item, error]) and 'stages',
+        with for the source and each stage:
+
+           'in', 'out', 'failed', the number of items in, out and failed
+           'busy', the time (s) spent in func, summed over the workers
+           'blocked', the time (s) waiting for room in the next queue
+           'depth', 'max_depth', the items in its queue now, and at most
+           'per_s', the items out per second since the start
+
+        A failure of func on an item is reported and the item dropped
+        (or passed on, see stage), the other items go on.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+    loop = asyncio.get_running_loop()
+    if report is None:
+        report = log_pipeline
+    queues = [asyncio.Queue(maxsize) for s in stages]
+    names = ['source'] + [s.name for s in stages]
+    summary = {'seconds':0., 'errors':[],
+               'stages':{n: {'in':0, 'out':0, 'failed':0, 'busy':0., 'blocked':0.,
+                             'depth':0, 'max_depth':0, 'per_s':0.} for n in names}}
+    # stages whose workers are done (only the end is left in their queue)
+    done = [False for s in stages]
+    t0 = time.perf_counter()
+
+    pools = {}
+    for s in stages:
+        if s.executor == 'thread':
+            pools[s.name] = ThreadPoolExecutor(s.workers, thread_name_prefix='pycaliop-' + s.name)
+        elif s.executor == 'process':
+            pools[s.name] = ProcessPoolExecutor(s.workers)
+
+    def update():
+        # queue depths and throughputs, now
+        summary['seconds'] = time.perf_counter() - t0
+        for i, q in enumerate(queues):
+            summary['stages'][names[i+1]]['depth'] = 0 if done[i] else q.qsize()
+        for st in summary['stages'].values():
+            st['per_s'] = st['out'] / max(summary['seconds'], 1e-9)
+        return(summary)
+
+    async def put(i, item, st):
+        # puts item in queue i, waiting for room if needed
+        t = time.perf_counter()
+        await queues[i].put(item)
+        st['blocked'] += time.perf_counter() - t
+        # queue i is the input of stage i
+        nxt = summary['stages'][names[i+1]]
+        nxt['max_depth'] = max(nxt['max_depth'], queues[i].qsize())
+
+    async def call(s, func, *args):
+        if s.executor is None:
+            out = func(*args)
+            if asyncio.iscoroutine(out):
+                out = await out
+            return(out)
+        return(await loop.run_in_executor(pools[s.name], func, *args))
+
+    async def feed():
+        st = summary['stages']['source']
+        if hasattr(source, '__aiter__'):
+            async for item in source:
+                st['in'] += 1
+                st['out'] += 1
+                await put(0, item, st)
+        else:
+            for item in source:
+                st['in'] += 1
+                st['out'] += 1
+                await put(0, item, st)
+        await queues[0].put(_END)
+
+    async def work(i):
+        s = stages[i]
+        st = summary['stages'][s.name]
+        while True:
+            item = await queues[i].get()
+            if item is _END:
+                # for the other workers of the stage
+                await queues[i].put(_END)
+                return
+            st['in'] += 1
+            t = time.perf_counter()
+            try:
+                out = await call(s, s.func, item)
+            except (Exception, SystemExit) as err:
+                st['failed'] += 1
+                summary['errors'].append([s.name, _label(item), repr(err)])
+                _logger().warning('%s failed on %s: %r', s.name, _label(item), err)
+                if s.on_error != 'pass':
+                    continue
+                out = item
+            finally:
+                st['busy'] += time.perf_counter() - t
+            if out is None:
+                continue
+            st['out'] += 1
+            if i + 1 < len(stages):
+                await put(i + 1, out, st)
+
+    async def run(i):
+        s = stages[i]
+        await asyncio.gather(*[work(i) for k in range(s.workers)])
+        done[i] = True
+        if s.close is not None:
+            await call(s, s.close)
+        if i + 1 < len(stages):
+            await queues[i+1].put(_END)
+
+    async def monitor():
+        while True:
+            await asyncio.sleep(interval)
+            report(update())
+
+    tasks = [asyncio.ensure_future(feed())] + \
+        [asyncio.ensure_future(run(i)) for i in range(len(stages))]
+    watcher = asyncio.ensure_future(monitor())
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks + [watcher]:
+            task.cancel()
+        for pool in pools.values():
+            pool.shutdown(wait=True)
+
+    return(update())
+
+
+async def watch(pattern, interval=30., stop=None):
+    """WATCH   Files arriving in a directory, for run_pipeline
+
+        async for filen in WATCH(pattern): yields the files matching the
+        glob pattern, the ones already there and then the new ones as
+        they arrive, checking every interval seconds. A file is only
+        yielded once its size did not change between two checks, so
+        files being copied are not read too early. It runs until stop
+        (an asyncio.Event) is set, or forever.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import glob
+
+    seen = set()
+    sizes = {}
+    while True:
+        for filen in sorted(glob.glob(pattern)):
+            if filen in seen:
+                continue
+            try:
+                size = os.stat(filen).st_size
+            except OSError:
+                continue
+            if sizes.get(filen) == size:
+                seen.add(filen)
+                del sizes[filen]
+                yield filen
+            else:
+                sizes[filen] = size
+        if (stop is not None) and stop.is_set():
+            return
+        if stop is None:
+            await asyncio.sleep(interval)
+        else:
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+def vfm_stages(outdir, fields=['type'], res=1., size=[1000, 300], readers=2,
+               decoders=None, renderers=2):
+    """VFM_STAGES   Read, decode, aggregate and render stages
+
+        [stages] = VFM_STAGES(outdir) returns the stages of a pipeline
+        (see run_pipeline) that takes VFM file names and:
+
+           'read', reads the file (vfm_read), with readers threads
+           'decode', expands the rows and decodes each flag in fields
+                     (vfm_expand and vfm_type), with decoders processes
+                     (default: number of cpus)
+           'aggregate', counts the profiles and the pixels of each value
+                     of the flags in cells of res degrees (as the grid
+                     command of the cli), and saves the totals of all
+                     granules at the end, per product version
+                     (outdir/grid_<field>.npz for V4, see cli.grid_file)
+           'render', saves each flag as a size (w x h) image with
+                     vfm_png, outdir/<granule>_<field>.png, with
+                     renderers threads
+
+        A granule that cannot be aggregated is still rendered. The
+        granules are dropped after the render stage.
+
+        History:
+           2026-oct-19 Module functions, decoding in processes, totals
+                       per product version.
+
+           2026-oct-19 First version
+
+    """
+
+    import functools
+    from . import cli
+
+    [lat_edges, lon_edges] = cli.grid_edges(res)
+    grid = {'Lat':lat_edges, 'Lon':lon_edges, 'Totals':{}}
+    os.makedirs(outdir, exist_ok=True)
+
+    return([stage('read', _read, workers=readers),
+            stage('decode', functools.partial(_decode, fields),
+                  workers=decoders or os.cpu_count(), executor='process'),
+            stage('aggregate', functools.partial(_aggregate, grid), workers=1,
+                  close=functools.partial(_save, outdir, grid), on_error='pass'),
+            stage('render', functools.partial(_render, outdir, size), workers=renderers)])
+
+
+def log_pipeline(summary, logger=None, level=None):
+    """Logs one line per stage of a summary of run_pipeline, to the
+    'pycaliop' logger by default"""
+    import logging
+    if logger is None:
+        logger = _logger()
+    if level is None:
+        level = logging.INFO
+    for name, s in summary['stages'].items():
+        logger.log(level, '%-12s in %6d  out %6d  failed %4d  busy %9.2f s  '
+                   'blocked %9.2f s  queue %3d (max %3d)  %8.2f /s', name,
+                   s['in'], s['out'], s['failed'], s['busy'], s['blocked'],
+                   s['depth'], s['max_depth'], s['per_s'])
+
+
+def _logger():
+    import logging
+    return(logging.getLogger('pycaliop'))
+
+
+def _label(item):
+    # short name of an item, the file of a granule
+    if isinstance(item, dict):
+        return(str(item.get('File', '<granule>')))
+    return(str(item)[:200])
+
+
+def _read(filen):
+    # read stage: the granule, with its file name
+    from . import vfm_read
+    vfm_file = vfm_read.vfm_read(filen)
+    vfm_file['File'] = filen
+    return(vfm_file)
+
+
+def _decode(fields, vfm_file):
+    # decode stage: the flags of the granule, in a worker process
+    from . import cli
+    from . import vfm_expand
+    vfm_type = cli.vfm_decoder(vfm_file)
+    block = vfm_expand.vfm_expand(vfm_file.pop('Data'))
+    vfm_file['Fields'] = {tag: vfm_type.vfm_type(block, tag) for tag in fields}
+    return(vfm_file)
+
+
+def _aggregate(grid, vfm_file):
+    # aggregate stage: adds the granule to the totals of its version
+    from . import cli
+    counts = cli.grid_counts(vfm_file['Latitude'], vfm_file['Longitude'],
+                             vfm_file['Fields'], grid['Lat'], grid['Lon'])
+    if not cli.grid_add(grid['Totals'], counts, vfm_file['Version']):
+        _logger().warning('aggregate: %s has different values, not counted', vfm_file['File'])
+    return(vfm_file)
+
+
+def _save(outdir, grid):
+    # end of the aggregate stage: the totals of each version
+    from . import cli
+    cli.grid_save(outdir, grid['Totals'])
+
+
+def _render(outdir, size, vfm_file):
+    # render stage: one image per flag
+    from . import cli
+    from . import vfm_png
+    for tag, vfm in vfm_file['Fields'].items():
+        out = cli.output_file(outdir, vfm_file['File'], '_' + tag + '.png')
+        vfm_png.vfm_png(out, vfm, size=size, y=vfm_file['Altitude'],
+                        version=vfm_file['Version'])
+    return(vfm_file['File'])
@@ -0,0 +1,430 @@
+def vfm_plot(vfm, xs, y, imgSize = [1300, 667], dpi=96, render='image',
+             decimate=True, out=None, version=4, interactive=False):
+    """VFM_PLOT   Plots a VFM feature
+
+        VFM_PLOT(vfm, xs, y) plots the feature inside the vfm
+        structure. xs is a two column array with values for the
+        x-axis, typically lat and lon, and y is one column array with
+        values for the y-axis, typically the altitude.
+        
+        vfm_class is a structure that contains information about the
+        vfm flag returned, and contains the following fields:
+        
+           'Data', the feature flag data (int16)
+           'FieldDescription', the feature flag name 
+           'Vmin' and 'Vmax', the limits of the feature flag
+           'ByteTxt', descriptors of the feature flag
+
+        VFM_PLOT(..., imgSize=[1300,667], dpi=96) allow passing
+        optional argument to change the default image size and
+        resolution.
+
+        VFM_PLOT(..., render='image') chooses how the data is drawn.
+        'image' (default) maps the flags through the colormap into an
+        uint8 RGB image and draws it with imshow, one image per
+        altitude regime (the VFM has 180m, 60m and 30m vertical
+        resolutions), which is much faster and lighter than
+        pcolormesh. render='mesh' uses pcolormesh, as in the original
+        code.
+
+        VFM_PLOT(..., decimate=True) merges the data pixels that fall
+        on the same screen pixel before drawing, with a reduction that
+        preserves the categories and keeps thin features (see
+        vfm_decimate). The drawing time then depends on the figure size
+        rather than on the data size. Use decimate=False to draw every
+        pixel.
+
+        VFM_PLOT(..., out=out) draws on the figure returned by a
+        previous call, replacing only the data, title, colorbar and
+        caption. This is much faster than creating a new figure, and
+        can be used to plot several features of the same granule (xs
+        and y must be the same).
+
+        VFM_PLOT(..., version=3) uses the colors of the V3 products.
+
+        VFM_PLOT(..., interactive=True) draws the curtain as a single
+        image at the resolution of the screen, and redraws it whenever
+        the axis is zoomed, panned or resized, using only the visible
+        profiles (see vfm_view). The full resolution data is kept in
+        memory, so thin features appear as one zooms in. render and
+        decimate are ignored.
+                
+        The function returns handlers for: figure, axis, colorbar and
+        text legend.
+
+        History: 
+           2026-oct-19 Added render='image', drawing with imshow instead
+                       of pcolormesh. Added decimate=True, reducing the
+                       data to the display resolution instead of warning
+                       that pixels may be hidden. Added out=, to reuse
+                       a figure. Removed reload of CreateColorMap.
+                       Added version. Added interactive, re-rendering
+                       the visible data on zoom and pan. Records its
+                       time in vfm_stats (stage 'plot').
+
+           2021-may-24 Translated from Matlab to Python
+
+           2021-mar-27 Opmization for layout on multiple Matlab version.
+        
+           2021-mar-20 Makes use of metadata in vfm dictionary
+           
+           2005-mar-28 Original code by Ralph Kuehn shared on CALIPO's
+                       website, from 2005/03/28.
+
+    """
+
+    import matplotlib as mpl
+    import matplotlib.ticker as mtk
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import sys
+    from . import CreateColorMap
+    from . import vfm_decimate
+    from . import vfm_stats
+
+    t0 = vfm_stats.start()
+
+    # Determine or set image size
+    if len(imgSize) != 2:
+        sys.error('imgSize is not of a usable size. Must be of length 2, it is ' + np.shape(imgSize));
+
+    axpos = np.array([0.062, 0.121, 0.837, 0.788])
+
+    if out is None:
+        # Create Figure & set size
+        #fig = plt.figure(num=1, figsize=np.float64(imgSize)/dpi, dpi=dpi, clear=True)
+        fig = plt.figure(figsize=np.float64(imgSize)/dpi, dpi=dpi, clear=True)
+        ax0 = fig.add_subplot(111)
+        ax0.set_position(pos=axpos)
+    else:
+        # Reuse figure, just remove the previous data
+        [fig, [ax0, ax1], cb, th] = out
+        for art in list(ax0.images) + list(ax0.collections):
+            art.remove()
+
+    cmap = CreateColorMap.CreateColorMap(vfm['FieldDescription'], version=version)
+    
+    ## We should set the y-axis limits of the colorbar. Because we are
+    ## plotting integer numbers, and we want them centered with the colors in
+    ## the colorbar, the range has to be +-0.5 wider than the actual range
+    norm = mpl.colors.Normalize(vmin=vfm['Vmin']-0.5, vmax=vfm['Vmax']+0.5)
+
+    # Merge pixels smaller than the screen pixels, so that the drawing
+    # time does not depend on the data size and thin features are kept
+    x = xs[0]
+    if interactive:
+        vfm_interactive(ax0, vfm, x, y, [-2., 30.], version=version)
+        im = mpl.cm.ScalarMappable(norm=norm, cmap=cmap)
+        render = None
+    elif decimate:
+        nx = int(imgSize[0]*axpos[2])
+        ny = int(imgSize[1]*axpos[3])
+        vfm, x, y = vfm_decimate.vfm_decimate(vfm, x, y, nx, ny, ylim=[-2., 30.])
+
+    if render == 'mesh':
+        im = ax0.pcolormesh(x, y, np.float64(vfm['Data']), edgecolors='none', shading='auto',
+                           cmap=cmap, norm=norm)
+    elif render is None:
+        pass
+    elif render == 'image':
+        rgb = vfm_rgb(vfm, version=version)
+        vfm_imshow(ax0, rgb, x, y)
+        im = mpl.cm.ScalarMappable(norm=norm, cmap=cmap)
+    else:
+        sys.exit('Unknown render option: ' + str(render))
+    ax0.set_ylim([-2., 30.])
+    
+    # Title
+    ax0.set_title(vfm['FieldDescription'], fontdict={'fontsize': 18})
+
+    if out is not None:
+        # Axes are already there, update colorbar and caption
+        cb.update_normal(im)
+        cb.ax.yaxis.set_ticks(np.arange(vfm['Vmin'], vfm['Vmax']+1))
+        th.set_text(_caption(vfm))
+        vfm_stats.stop(t0, 'plot')
+        return(out)
+
+    # axis labels
+    fd = {'fontsize': 12, 'fontweight': 'bold', 'fontfamily': 'verdana'}
+    plt.ylabel('Altitude (km)', fontdict=fd)
+
+    # axis ticks (latitude)
+    dx = (max(xs[0])-min(xs[0]))/8.
+    ticks = np.arange(min(xs[0]), max(xs[0]) + dx, dx)
+    if interactive:
+        # ticks follow zoom and pan
+        ax0.xaxis.set_major_locator(mtk.MaxNLocator(8))
+    else:
+        ax0.xaxis.set_ticks(ticks)
+    ax0.xaxis.set_major_formatter('{x:5.2f}')
+    ax0.set_xlabel('Lat', fontdict=fd)
+    ax0.xaxis.set_label_coords(-0.045, -0.03)
+
+    plt.xticks(fontsize=12)#,fontweight='bold')
+    plt.yticks(fontsize=12)#,fontweight='bold')
+    #ax0.xaxis.set_minor_locator(mtk.AutoMinorLocator(4))
+    ax0.yaxis.set_minor_locator(mtk.AutoMinorLocator(5))
+    ax0.yaxis.set_ticks_position('both')
+    ax0.tick_params(which='major',length=8)
+    ax0.tick_params(which='minor',length=5)
+    
+    # axis ticks (longitude)
+    # we need to create a new axis
+    ax1 = ax0.twiny()
+    ax1.set_position(pos=axpos - [0, 0.1, 0, 0])
+    ax1.xaxis.set_ticks_position("bottom")
+    ax1.xaxis.set_label_position("bottom")
+    ax1.spines["bottom"].set_position(("axes", -0.062))
+    ax1.set_frame_on(False)
+
+    dx = (max(xs[1])-min(xs[1]))/8.
+    ticks = np.arange(min(xs[1]), max(xs[1]) + dx, dx)
+    if interactive:
+        ax1.xaxis.set_major_locator(mtk.MaxNLocator(8))
+    else:
+        ax1.xaxis.set_ticks(ticks)
+    ax1.xaxis.set_major_formatter('{x:5.2f}')
+    ax1.set_xlabel('Lon', fontdict=fd)
+    ax1.xaxis.set_label_coords(-0.045, -0.068)
+    ax1.set_xlim([xs[1][0], xs[1][-1]])
+    ax1.tick_params(which='both',length=0)
+    if interactive:
+        # longitude limits follow the latitude ones
+        order = np.argsort(xs[0])
+        lat_s, lon_s = np.float64(xs[0])[order], np.float64(xs[1])[order]
+        ax0.callbacks.connect('xlim_changed', lambda ax:
+                              ax1.set_xlim(np.interp(ax.get_xlim(), lat_s, lon_s)))
+    plt.xticks(fontsize=12)#,fontweight='bold')
+    
+    # colorbar 
+    cb = plt.colorbar(im, ax=ax0)
+    cb.ax.tick_params(length=0)
+    ticks = np.arange(vfm['Vmin'], vfm['Vmax']+1)
+    cb.ax.yaxis.set_ticks(ticks)
+
+    # fixes axes positions after ploting the colorbar
+    ax0.set_position(pos=axpos)
+    cb.ax.set_position(pos=[0.919, 0.121, 0.021, 0.788])
+
+    # Create bottom caption for flag's values
+    typelabel = _caption(vfm)
+    
+    #th = annotation('textbox',[0.062 0.0 0.837 0.04],'string',typelabel);
+    th = fig.text(0.5, 0.015, typelabel, fontsize=12, fontweight='bold', fontfamily='verdana',
+             ha='center', va='center')
+
+    vfm_stats.stop(t0, 'plot')
+
+    return([fig, [ax0, ax1], cb, th])
+
+
+def vfm_rgb(vfm, version=4):
+    """VFM_RGB   Converts a VFM feature into an RGB image
+
+        [rgb] = VFM_RGB(vfm) maps the integer flags in vfm['Data']
+        through the colormap of the feature and returns an uint8 array
+        of size nzlev x total_times x 3. The colors are those
+        pcolormesh would give with the limits vfm['Vmin']-0.5 and
+        vfm['Vmax']+0.5, but they are taken from a lookup table (see
+        CreateColorMap.ColorMapLUT). version=3 uses the colors of the
+        V3 products.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+    from . import CreateColorMap
+
+    vmin, vmax = vfm['Vmin'], vfm['Vmax']
+    lut = CreateColorMap.ColorMapLUT(vfm['FieldDescription'], vmin, vmax, version=version)
+
+    # values outside [Vmin, Vmax] get the under/over colors, which for
+    # a ListedColormap are the first/last colors
+    ind = np.clip(vfm['Data'], vmin, vmax) - vmin
+
+    return(np.take(lut, ind, axis=0))
+
+
+def vfm_view(vfm, x, y, xlim, ylim, nx, ny, version=4):
+    """VFM_VIEW   Renders the visible part of a VFM feature
+
+        [rgba] = VFM_VIEW(vfm, x, y, xlim, ylim, nx, ny) returns an
+        uint8 image (ny x nx x 4, first row at ylim[1]) with the part of
+        vfm['Data'] inside xlim and ylim, as seen on an axis of nx by ny
+        pixels. Only the visible profiles are used, and they are merged
+        to the screen resolution with vfm_decimate, so the cost depends
+        on the zoom and the axis size rather than on the data size.
+        Regions without data are transparent.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+    from . import CreateColorMap
+    from . import vfm_decimate
+
+    x = np.float64(np.ravel(x))
+    y = np.float64(np.ravel(y))
+    nx, ny = max(int(nx), 1), max(int(ny), 1)
+    rgba = np.zeros((ny, nx, 4), dtype=np.uint8)
+
+    # visible profiles, plus one on each side
+    vis = np.flatnonzero((x >= min(xlim)) & (x <= max(xlim)))
+    if len(vis) == 0:
+        return(rgba)
+    i0, i1 = max(vis[0]-1, 0), min(vis[-1]+2, len(x))
+
+    sub = dict(vfm)
+    sub['Data'] = vfm['Data'][:, i0:i1]
+    sub, xg, yg = vfm_decimate.vfm_decimate(sub, x[i0:i1], y, nx, ny,
+                                            xlim=xlim, ylim=ylim)
+
+    # nearest merged pixel to the center of each screen pixel
+    xc = xlim[0] + (np.arange(nx) + 0.5) * (xlim[1] - xlim[0]) / nx
+    yc = ylim[1] - (np.arange(ny) + 0.5) * (ylim[1] - ylim[0]) / ny
+    [icol, xin] = _nearest(xg, xc)
+    [irow, yin] = _nearest(yg, yc)
+
+    lut = CreateColorMap.ColorMapLUT(vfm['FieldDescription'], vfm['Vmin'], vfm['Vmax'],
+                                     version=version)
+    ind = np.clip(sub['Data'][irow[:, None], icol[None, :]], vfm['Vmin'], vfm['Vmax']) - vfm['Vmin']
+    rgba[:, :, :3] = np.take(lut, ind, axis=0)
+    rgba[:, :, 3] = 255 * (yin[:, None] & xin[None, :])
+
+    return(rgba)
+
+
+def vfm_interactive(ax, vfm, x, y, ylim, version=4):
+    """VFM_INTERACTIVE   Draws a VFM feature that follows zoom and pan
+
+        [im] = VFM_INTERACTIVE(ax, vfm, x, y, ylim) draws vfm on axis ax
+        as a single image rendered by vfm_view at the resolution of the
+        axis, and connects to the xlim_changed, ylim_changed and resize
+        events so that the image is rendered again, and updated in
+        place, for the new view. Returns the image.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+
+    x = np.float64(np.ravel(x))
+    xlim = [np.min(x), np.max(x)]
+
+    im = ax.imshow(np.zeros((1, 1, 4), dtype=np.uint8), origin='upper', aspect='auto',
+                   interpolation='nearest', extent=(xlim[0], xlim[1], ylim[0], ylim[1]))
+    ax.set_xlim(xlim)
+    ax.set_ylim(ylim)
+
+    state = {'view':None, 'cids':[]}
+
+    def update(*args):
+        if im.axes is None:
+            # image was removed (e.g. vfm_plot(..., out=)), stop following
+            for ev, cid in state['cids']:
+                if ev == 'resize_event':
+                    ax.figure.canvas.mpl_disconnect(cid)
+                else:
+                    ax.callbacks.disconnect(cid)
+            return
+        xl, yl = ax.get_xlim(), ax.get_ylim()
+        nx, ny = ax.bbox.width, ax.bbox.height
+        view = (xl, yl, int(nx), int(ny))
+        if view == state['view']:
+            return
+        state['view'] = view
+        im.set_data(vfm_view(vfm, x, y, xl, yl, nx, ny, version=version))
+        im.set_extent((xl[0], xl[1], yl[0], yl[1]))
+
+    state['cids'] = [('xlim_changed', ax.callbacks.connect('xlim_changed', update)),
+                     ('ylim_changed', ax.callbacks.connect('ylim_changed', update)),
+                     ('resize_event', ax.figure.canvas.mpl_connect('resize_event', update))]
+    update()
+
+    return(im)
+
+
+def vfm_imshow(ax, rgb, x, y):
+    """VFM_IMSHOW   Draws an RGB curtain on a non-uniform altitude grid
+
+        [ims] = VFM_IMSHOW(ax, rgb, x, y) draws rgb (nzlev x
+        total_times x 3) on axis ax, with x and y the centers of the
+        pixels. imshow only handles uniform grids, so the rows are
+        split in blocks of constant height (i.e. one block per altitude
+        regime of the VFM, plus the rows in between) and each block is
+        drawn as a separate image. Cell edges are the mid-points
+        between centers, as in pcolormesh(..., shading='auto'). Returns
+        the list of images.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+
+    x = np.float64(np.ravel(x))
+    y = np.float64(np.ravel(y))
+
+    xedge = _edges(x)
+    yedge = _edges(y)
+
+    # group consecutive rows with the same height (to the meter)
+    dy = np.round(np.diff(yedge)*1000.)
+    brk = np.flatnonzero(np.diff(dy) != 0) + 1
+    starts = np.concatenate([[0], brk])
+    ends = np.concatenate([brk, [len(y)]])
+
+    ims = []
+    for a, b in zip(starts, ends):
+        ims.append(ax.imshow(rgb[a:b], origin='upper', aspect='auto',
+                             interpolation='nearest',
+                             extent=(xedge[0], xedge[-1], yedge[b], yedge[a])))
+
+    # imshow sets the limits to each extent, reset to the whole image
+    # and keep axis increasing as with pcolormesh
+    ax.set_xlim(min(xedge[0], xedge[-1]), max(xedge[0], xedge[-1]))
+    ax.set_ylim(min(yedge[0], yedge[-1]), max(yedge[0], yedge[-1]))
+
+    return(ims)
+
+
+def _caption(vfm):
+    # bottom caption with the meaning of each flag value
+    typelabel = '';
+    for i, txt in enumerate(vfm['ByteTxt']):
+        typelabel += '%d = %s    '%(vfm['Vmin']+i, txt)
+    return(typelabel)
+
+
+def _nearest(c, target):
+    # index of the element of c closest to each target, and whether the
+    # target is inside the range of c (half a step beyond the ends)
+    import numpy as np
+
+    order = np.argsort(c)
+    cs = c[order]
+    if len(cs) == 1:
+        return([np.zeros(len(target), dtype=np.int64), np.abs(target - cs[0]) <= 0.5])
+    k = np.clip(np.searchsorted(cs, target), 1, len(cs)-1)
+    k = np.where(np.abs(cs[k-1] - target) <= np.abs(cs[k] - target), k-1, k)
+    inside = (target >= cs[0] - 0.5*(cs[1] - cs[0])) & (target <= cs[-1] + 0.5*(cs[-1] - cs[-2]))
+    return([order[k], inside])
+
+
+def _edges(c):
+    # cell edges from cell centers, extrapolating at the ends
+    import numpy as np
+
+    if len(c) < 2:
+        return(np.array([c[0]-0.5, c[0]+0.5]))
+    mid = 0.5*(c[1:] + c[:-1])
+    return(np.concatenate([[2*c[0]-mid[0]], mid, [2*c[-1]-mid[-1]]]))
+#
@@ -0,0 +1,154 @@
+def vfm_png(filen, vfm, size=None, y=None, ylim=[-2., 30.], axes=False,
+            version=4, compress=6):
+    """VFM_PNG   Saves a VFM feature as a palette PNG, without matplotlib
+
+        [img, palette] = VFM_PNG(filen, vfm) writes the feature flag in
+        vfm (as returned by vfm_type) to the PNG file filen. Each pixel
+        is a VFM pixel (one level by one expanded profile) and stores the
+        index of its color in the palette of the feature (the same
+        colors used by vfm_plot, see CreateColorMap.ColorMapLUT). Only
+        NumPy and zlib are used, so this is much faster than saving a
+        figure and is meant for large numbers of thumbnails.
+
+        VFM_PNG(..., size=[w, h]) reduces the image to w x h pixels,
+        merging the pixels with vfm_decimate.vfm_reduce (so thin
+        features are kept). Without y, rows are VFM levels, and the
+        altitude axis is not linear (30m below 8km, 60m up to 20km and
+        180m above).
+
+        VFM_PNG(..., y=alt, ylim=[-2., 30.]) places the rows by altitude
+        instead, with a linear axis between ylim[0] (bottom) and
+        ylim[1] (top), as in vfm_plot. Regions without data are white.
+
+        VFM_PNG(..., axes=True) adds a simple frame with 8 ticks along
+        each axis on the left and bottom of the image. There are no
+        labels.
+
+        version=3 uses the colors of the V3 products, and compress is the
+        zlib compression level. The palette indexes and the palette
+        (ncolors x 3, uint8) are returned.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+    from . import CreateColorMap
+    from . import vfm_decimate
+    from . import vfm_stats
+
+    t0 = vfm_stats.start()
+    data = vfm['Data']
+    [nz, nt] = data.shape
+    vmin, vmax = vfm['Vmin'], vfm['Vmax']
+
+    if size is None:
+        size = [nt, nz]
+    [w, h] = size
+
+    # group profiles and levels that fall on the same pixel
+    cstart = np.arange(nt)
+    if w < nt:
+        cstart = vfm_decimate.decimate_index(np.arange(nt), w, [0, nt])
+    if y is None:
+        rstart = np.arange(nz)
+        if h < nz:
+            rstart = vfm_decimate.decimate_index(np.arange(nz), h, [0, nz])
+    else:
+        y = np.float64(np.ravel(y))
+        rstart = vfm_decimate.decimate_index(y, h, ylim)
+
+    if (len(cstart) < nt) | (len(rstart) < nz):
+        data = vfm_decimate.vfm_reduce(vfm, rstart, cstart)
+
+    # palette, plus white (no data) and black (axes)
+    lut = CreateColorMap.ColorMapLUT(vfm['FieldDescription'], vmin, vmax, version=version)
+    white, black = len(lut), len(lut)+1
+    palette = np.concatenate([lut, [[255, 255, 255], [0, 0, 0]]]).astype(np.uint8)
+
+    img = np.uint8(np.clip(data, vmin, vmax) - vmin)
+
+    # stretch to w x h, nearest neighbour
+    icol = np.arange(w) * img.shape[1] // w
+    if y is None:
+        irow = np.arange(h) * img.shape[0] // h
+        img = img[irow[:, None], icol[None, :]]
+    else:
+        # altitude of the center of each pixel row, from the top
+        dz = (ylim[1] - ylim[0]) / h
+        zrow = ylim[1] - (np.arange(h) + 0.5) * dz
+        yg = np.add.reduceat(y, rstart) / np.diff(np.append(rstart, nz))
+        order = np.argsort(yg)
+        k = np.clip(np.searchsorted(yg[order], zrow), 1, len(yg)-1)
+        near = np.where(np.abs(yg[order][k-1] - zrow) < np.abs(yg[order][k] - zrow), k-1, k)
+        irow = order[near]
+        img = img[irow[:, None], icol[None, :]]
+        # outside the data there is nothing
+        outside = (zrow < np.min(y) - dz) | (zrow > np.max(y) + dz)
+        img[outside, :] = white
+
+    if axes:
+        img = _add_axes(img, white, black)
+
+    png_write(filen, img, palette, compress=compress)
+    vfm_stats.stop(t0, 'png', nbytes=img.nbytes)
+
+    return([img, palette])
+
+
+def png_write(filen, img, palette, compress=6):
+    """PNG_WRITE   Writes a palette PNG file
+
+        PNG_WRITE(filen, img, palette) writes img, an uint8 array (height
+        x width) with indexes into palette (ncolors x 3, uint8, at most
+        256 colors) as an 8-bit palette PNG file. compress is the zlib
+        compression level.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+    import struct
+    import zlib
+
+    img = np.ascontiguousarray(img, dtype=np.uint8)
+    [h, w] = img.shape
+
+    # each row starts with its filter type (0 = none)
+    raw = np.zeros((h, w+1), dtype=np.uint8)
+    raw[:, 1:] = img
+
+    def chunk(tag, data):
+        return(struct.pack('>I', len(data)) + tag + data
+               + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+    with open(filen, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', w, h, 8, 3, 0, 0, 0)))
+        f.write(chunk(b'PLTE', np.ascontiguousarray(palette, dtype=np.uint8).tobytes()))
+        f.write(chunk(b'IDAT', zlib.compress(raw.tobytes(), compress)))
+        f.write(chunk(b'IEND', b''))
+
+
+def _add_axes(img, white, black, pad=6, nticks=8):
+    # white strips on the left and bottom, with a frame and ticks
+    import numpy as np
+
+    [h, w] = img.shape
+    out = np.full((h+pad, w+pad), white, dtype=np.uint8)
+    out[:h, pad:] = img
+
+    # frame
+    out[:h, pad-1] = black
+    out[h, pad-1:] = black
+
+    # ticks
+    xt = pad - 1 + np.int64(np.round(np.linspace(0, w, nticks+1)))
+    yt = np.int64(np.round(np.linspace(0, h, nticks+1)))
+    out[h:h+pad//2+1, np.minimum(xt, w+pad-1)] = black
+    out[np.minimum(yt, h), pad//2:pad] = black
+
+    return(out)
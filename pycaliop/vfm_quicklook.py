@@ -0,0 +1,131 @@
+VFMTYPES = ['type', 'typeqa', 'phase', 'phaseqa', 'aerosol', 'cloud',
+            'psc', 'subtype', 'subtypeqa', 'averaging']
+
+
+def vfm_quicklook(filen, outdir='.', fields=VFMTYPES, map=True,
+                  imgSize=[1300, 667], dpi=96):
+    """VFM_QUICKLOOK   Saves quicklook images of a VFM granule
+
+        [files] = VFM_QUICKLOOK(filen) reads the VFM file filen, expands
+        it once and saves one PNG image for each feature flag in
+        VFMTYPES, plus a map with the calipso track. Images are named
+        after the granule, e.g. <granule>_type.png and <granule>_map.png,
+        and the list of files written is returned.
+
+        The same figure is reused for all flags (see vfm_plot(...,
+        out=)), so the axes, ticks and labels are only created once.
+        Run it with a non-interactive backend (e.g. Agg), as
+        vfm_quicklook_batch() does.
+
+        VFM_QUICKLOOK(..., outdir='.', fields=VFMTYPES, map=True) allow
+        choosing the output directory, the flags to plot and whether to
+        plot the map. imgSize and dpi are passed to vfm_plot.
+
+        Images are written to a temporary name and renamed when
+        complete, so an interrupted run never leaves a truncated image.
+
+        History:
+           2026-oct-19 Images written to a temporary name and renamed.
+
+           2026-oct-19 First version
+
+    """
+
+    import os
+    import matplotlib.pyplot as plt
+    from . import vfm_read
+    from . import vfm_expand
+    from . import vfm_plot
+
+    vfm_file = vfm_read.vfm_read(filen)
+    if vfm_file['Version'] == 3:
+        from . import vfm_type_v3 as vfm_type
+    else:
+        from . import vfm_type
+
+    vfmblock = vfm_expand.vfm_expand(vfm_file['Data'])
+    xs = [vfm_file['Latitude'], vfm_file['Longitude']]
+    alt = vfm_file['Altitude']
+
+    base = os.path.join(outdir, os.path.splitext(os.path.basename(filen))[0])
+    files = []
+
+    out = None
+    for tag in fields:
+        vfmflag = vfm_type.vfm_type(vfmblock, tag)
+        out = vfm_plot.vfm_plot(vfmflag, xs, alt, imgSize=imgSize, dpi=dpi, out=out,
+                                version=vfm_file['Version'])
+        files.append(base + '_' + tag + '.png')
+        _savefig(out[0], files[-1], dpi)
+    if out is not None:
+        plt.close(out[0])
+
+    if map:
+        from . import map_plot
+        out = map_plot.map_plot(xs[0], xs[1], world=0.15)
+        files.append(base + '_map.png')
+        _savefig(out[0], files[-1], dpi)
+        plt.close(out[0])
+
+    return(files)
+
+
+def vfm_quicklook_batch(files, outdir='.', workers=None, **kwargs):
+    """VFM_QUICKLOOK_BATCH   Saves quicklook images for many granules
+
+        [done] = VFM_QUICKLOOK_BATCH(files, outdir) runs vfm_quicklook()
+        for each VFM file in files, spreading the granules across a pool
+        of worker processes that use the Agg backend. workers is the
+        number of processes (default is the number of cpus), and
+        workers=1 runs everything in the current process (still with
+        the Agg backend). Other keywords are passed to vfm_quicklook.
+
+        A granule that fails is reported and skipped. done is a
+        dictionary with the list of images saved for each granule
+        (None for failed granules).
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    os.makedirs(outdir, exist_ok=True)
+
+    done = {}
+    if workers == 1:
+        _init_worker()
+        for filen in files:
+            done[filen] = _quicklook(filen, outdir, kwargs)
+        return(done)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        jobs = {filen: pool.submit(_quicklook, filen, outdir, kwargs) for filen in files}
+        for filen, job in jobs.items():
+            done[filen] = job.result()
+
+    return(done)
+
+
+def _init_worker():
+    # headless rendering, no window is ever created
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _quicklook(filen, outdir, kwargs):
+    # one granule, failures are reported but do not stop the batch
+    try:
+        return(vfm_quicklook(filen, outdir=outdir, **kwargs))
+    except (Exception, SystemExit) as err:
+        print('Error: could not process ' + filen + ': ' + str(err))
+        return(None)
+
+
+def _savefig(fig, filen, dpi):
+    # PNG written then renamed, so other processes never see half a file
+    import os
+    fig.savefig(filen + '.tmp', dpi=dpi, format='png')
+    os.replace(filen + '.tmp', filen)
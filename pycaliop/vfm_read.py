@@ -0,0 +1,209 @@
+def vfm_read(filen, data=True, mmap=False):
+    """VFM_READ   Reads a CALIPSO VFM granule
+
+        [vfm_file] = VFM_READ(filen) reads the feature classification
+        flags and the coordinates from the HDF4 VFM file filen. It
+        returns a dictionary with the following fields:
+
+           'Data', the Feature_Classification_Flags (ntimes x 5515, uint16)
+           'Latitude', 'Longitude', one value per expanded profile
+                       (15 x ntimes), to be used with vfm_expand()
+           'Time', the profile time (TAI seconds) per expanded profile
+           'Altitude', the altitude of each VFM level (545 values, km)
+           'Rows', the number of rows (ntimes)
+           'Version', the product version (3 or 4), see vfm_version()
+
+        Not all data files have the ssLatitude variable, with the
+        latitude of the level 1 data (i.e. 333m). If it is not there,
+        Latitude, Longitude and Time are interpolated from the level 2
+        values.
+
+        VFM_READ(filen, data=False) reads only the coordinates, Data is
+        None and 'Rows' gives the number of rows in the file. Use
+        vfm_read_rows() to read the data later, or part of it.
+
+        VFM_READ(filen, mmap=True) returns Data as a view of the file
+        (np.memmap, see vfm_mmap) when the flags are stored uncompressed,
+        so that they are only read from the file when used.
+
+        Reading time and size are recorded as stage 'read' of vfm_stats.
+
+        History:
+           2026-oct-19 Added mmap=, memory-mapped Data.
+
+           2026-oct-19 First version, from example.py
+
+    """
+
+    import numpy as np
+    import sys
+    from pyhdf import SD
+    from pyhdf import HDF
+    from pyhdf import VS
+    from . import vfm_stats
+
+    t0 = vfm_stats.start()
+    h4sd = SD.SD(filen)
+    sds = h4sd.select('Feature_Classification_Flags')
+    if data and mmap:
+        from . import vfm_mmap
+        data = vfm_mmap.vfm_read_mmap(filen)
+        cnt = data.shape[0]
+    elif data:
+        data = sds.get()
+        [cnt, cline] = np.shape(data)
+    else:
+        data = None
+        cnt = sds.info()[2][0]
+    sds.endaccess()
+    nt = 15*cnt
+
+    datasets = h4sd.datasets()
+    if 'ssLatitude' in datasets:
+        lat = np.float64(h4sd.select('ssLatitude').get())[:,0]
+        lon = np.float64(h4sd.select('ssLongitude').get())[:,0]
+        time = np.float64(h4sd.select('ssProfile_Time').get())[:,0]
+    else:
+        # Not sure if this is correct. Need to check "where" the Latitute of a L2
+        # product is placed relative to the L1 positions.
+        xi = np.arange(nt)-0.5
+        xp = 15*(np.arange(cnt)-0.5)
+        lat = np.interp(xi, xp, np.float64(h4sd.select('Latitude').get()[:,0]))
+        lon = np.interp(xi, xp, np.float64(h4sd.select('Longitude').get()[:,0]))
+        time = np.interp(xi, xp, np.float64(h4sd.select('Profile_Time').get()[:,0]))
+    h4sd.end()
+
+    # read altitude
+    h4 = HDF.HDF(filen)
+    vs = VS.VS(h4)
+    vs_meta = vs.attach('metadata')
+    if not vs_meta.fexist('Lidar_Data_Altitudes'):
+        sys.exit('ERROR: Lidar_Data_Altitudes not found')
+
+    field_names = vs_meta.inquire()[2]
+    for i,tag in enumerate(field_names):
+        if tag == 'Lidar_Data_Altitudes':
+            alt = np.array(vs_meta[:][0][i])
+    vs_meta.detach()
+    vs.end()
+    h4.close()
+
+    alt = alt[ (alt > -0.5) & (alt < 30) ]
+
+    vfm_file = {'Data':data,
+                'Latitude':lat, 'Longitude':lon, 'Time':time,
+                'Altitude':alt,
+                'Rows':cnt,
+                'Version':vfm_version(filen)}
+
+    nbytes = lat.nbytes + lon.nbytes + time.nbytes + alt.nbytes
+    if (data is not None) and not isinstance(data, np.memmap):
+        nbytes += data.nbytes
+    vfm_stats.stop(t0, 'read', nbytes=nbytes, bytes_read=nbytes)
+
+    return(vfm_file)
+
+
+def vfm_read_rows(filen, start=0, stop=None, mmap=False):
+    """VFM_READ_ROWS   Reads some rows of a CALIPSO VFM granule
+
+        [data] = VFM_READ_ROWS(filen, start, stop) reads the rows start
+        to stop-1 of Feature_Classification_Flags (stop-start x 5515,
+        uint16) from the VFM file filen, i.e. the expanded profiles
+        15*start to 15*stop-1. Only those rows are read from the file.
+        stop=None reads to the end.
+
+        VFM_READ_ROWS(..., mmap=True) returns a view of the file instead
+        when possible (see vfm_mmap.vfm_read_mmap).
+
+        History:
+           2026-oct-19 Added mmap=.
+
+           2026-oct-19 First version
+
+    """
+
+    from pyhdf import SD
+    from . import vfm_stats
+
+    if mmap:
+        from . import vfm_mmap
+        return(vfm_mmap.vfm_read_mmap(filen, start, stop))
+
+    t0 = vfm_stats.start()
+    h4sd = SD.SD(filen)
+    sds = h4sd.select('Feature_Classification_Flags')
+    [rows, cline] = sds.info()[2]
+    if stop is None:
+        stop = rows
+    stop = min(stop, rows)
+    data = sds.get(start=(start, 0), count=(stop-start, cline))
+    sds.endaccess()
+    h4sd.end()
+    vfm_stats.stop(t0, 'read', nbytes=data.nbytes, bytes_read=data.nbytes)
+
+    return(data)
+
+
+def vfm_version(filen):
+    """VFM_VERSION   Product version from a VFM file name
+
+        [version] = VFM_VERSION(filen) returns 3 or 4 for file names such
+        as CAL_LID_L2_VFM-ValStage1-V3-30.* or
+        CAL_LID_L2_VFM-Standard-V4-20.*. V4 is assumed if the name does
+        not tell.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import os
+    import re
+
+    m = re.search(r'-V(\d)-\d+', os.path.basename(filen))
+    if m is None:
+        return(4)
+    return(int(m.group(1)))
+
+
+def vfm_granule_time(filen):
+    """VFM_GRANULE_TIME   Start time of a granule from its file name
+
+        [start] = VFM_GRANULE_TIME(filen) returns the start time (UTC) of
+        the granule as a numpy datetime64, for file names such as
+        CAL_LID_L2_VFM-Standard-V4-20.2013-05-06T17-20-01ZD.hdf, or None
+        if the name does not tell. It does not open the file, so it can
+        be used to sort and select many granules quickly.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import os
+    import re
+    import numpy as np
+
+    m = re.search(r'(\d{4}-\d\d-\d\d)T(\d\d)-(\d\d)-(\d\d)Z', os.path.basename(filen))
+    if m is None:
+        return(None)
+    return(np.datetime64('%sT%s:%s:%s' %m.groups(), 's'))
+
+
+def tai_to_datetime(time):
+    """TAI_TO_DATETIME   Converts CALIPSO profile times
+
+        [t] = TAI_TO_DATETIME(time) converts Profile_Time (seconds since
+        1993-01-01, as returned by vfm_read) to numpy datetime64 (ms).
+        Leap seconds are ignored, so times are some seconds ahead of UTC.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+
+    ms = np.round(np.asarray(time, dtype=np.float64)*1e3).astype(np.int64)
+    return(np.datetime64('1993-01-01T00:00:00', 'ms') + ms.astype('timedelta64[ms]'))
@@ -0,0 +1,222 @@
+"""Decoded granules from worker processes, through shared memory
+
+    from pycaliop import vfm_shm
+    for filen, out in vfm_shm.vfm_shm_map(files, fields=['type', 'phase']):
+        counts = np.bincount(out['Fields']['type']['Data'].ravel())
+
+reads, expands and decodes the granules in a pool of worker processes.
+Sending the 545 x (15 x ntimes) arrays back to the parent through the
+pool would pickle them, copy them through a pipe and unpickle them,
+which often costs more than decoding them. Instead, each worker puts
+the arrays of a granule in a shared memory segment
+(multiprocessing.shared_memory) and only returns a small descriptor:
+the name of the segment and the offset, shape, dtype and order of each
+array. The parent maps the segment and wraps NumPy arrays around it,
+without copying anything.
+
+The segment is removed (unlinked) as soon as the parent maps it, and
+the memory is freed once the arrays of the granule are gone. share()
+and attach() can be used for other arrays in the same way.
+
+History:
+   2026-oct-19 vfm_shm_map frees the segments of the granules not used
+               when the loop stops early.
+
+   2026-oct-19 First version
+
+"""
+
+import os
+
+# arrays start on cache lines
+_ALIGN = 64
+
+
+def vfm_shm_map(files, fields=['type'], block=False, workers=None, ahead=2):
+    """VFM_SHM_MAP   Decodes granules in worker processes
+
+        for filen, out in VFM_SHM_MAP(files, fields): reads each file,
+        expands its rows and decodes each flag in fields, in a pool of
+        workers processes (default: number of cpus), and yields the
+        granules in the order of files. out is a dictionary with 'File',
+        'Latitude', 'Longitude', 'Time', 'Altitude', 'Version', and
+        'Fields' with the vfm_type output of each field, whose 'Data'
+        arrays are in shared memory (see the module help). block=True
+        also returns the expanded block, as 'Block'.
+
+        At most ahead x workers granules are decoded before they are
+        used, so memory does not grow with the number of files. A
+        granule that fails is reported, and out is None. If the loop
+        stops early (break, or an error), the granules not decoded yet
+        are cancelled and the segments of those already decoded removed.
+
+        History:
+           2026-oct-19 Removes the segments of the granules not used.
+
+           2026-oct-19 First version
+
+    """
+
+    import collections
+    from concurrent.futures import ProcessPoolExecutor
+
+    if workers is None:
+        workers = os.cpu_count()
+
+    files = iter(files)
+    jobs = collections.deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            for filen in files:
+                jobs.append([filen, pool.submit(_decode, filen, fields, block)])
+                if len(jobs) < ahead*workers:
+                    continue
+                yield _result(*jobs.popleft())
+            while jobs:
+                yield _result(*jobs.popleft())
+        finally:
+            # granules not used, nobody else would remove their segments
+            for filen, job in jobs:
+                job.cancel()
+            for filen, job in jobs:
+                _discard(job)
+
+
+def share(arrays):
+    """SHARE   Copies arrays to a new shared memory segment
+
+        [desc] = SHARE(arrays) copies the arrays of the dictionary arrays
+        (keeping their C or Fortran order) in a new shared memory segment
+        and returns its descriptor, to be passed to attach() in another
+        process. The segment belongs to that process from then on: it
+        is not removed when the current one ends.
+
+    """
+
+    import numpy as np
+    from multiprocessing import shared_memory
+
+    layout = {}
+    size = 0
+    for k, a in arrays.items():
+        order = 'F' if (a.flags.f_contiguous and not a.flags.c_contiguous) else 'C'
+        layout[k] = [size, a.shape, a.dtype.str, order]
+        size += -(-a.nbytes // _ALIGN)*_ALIGN
+
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for k, a in arrays.items():
+        [offset, shape, dtype, order] = layout[k]
+        view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset, order=order)
+        view[...] = a
+        del view
+    # the parent removes it, not the resource tracker of this process
+    _untrack(shm)
+    shm.close()
+
+    return({'Name':shm.name, 'Size':size, 'Arrays':layout})
+
+
+def attach(desc):
+    """ATTACH   Arrays of a shared memory segment
+
+        [arrays] = ATTACH(desc) maps the segment described by desc (as
+        returned by share()) and returns a dictionary with its arrays,
+        without copying them. The segment is unlinked right away, and
+        its memory is freed when all the arrays are gone.
+
+    """
+
+    import numpy as np
+
+    seg = _Segment(desc['Name'])
+    return({k: np.asarray(_View(seg, *v)) for k, v in desc['Arrays'].items()})
+
+
+class _Segment:
+    # an attached segment, unmapped when no array uses it any more
+    def __init__(self, name):
+        import numpy as np
+        from multiprocessing import shared_memory
+
+        self.shm = shared_memory.SharedMemory(name)
+        # no other process needs the name, the mapping stays
+        self.shm.unlink()
+        self.address = np.frombuffer(self.shm.buf, dtype=np.uint8).ctypes.data
+
+    def __del__(self):
+        self.shm.close()
+
+
+class _View:
+    # one array of a segment, the base of the array keeps the segment
+    def __init__(self, seg, offset, shape, dtype, order):
+        import numpy as np
+
+        self.seg = seg
+        shape = tuple(shape)
+        strides = None
+        if (order == 'F') and (len(shape) > 1):
+            itemsize = np.dtype(dtype).itemsize
+            strides = tuple(int(itemsize*np.prod(shape[:i])) for i in range(len(shape)))
+        self.__array_interface__ = {'version':3, 'shape':shape, 'typestr':dtype,
+                                    'strides':strides, 'data':(seg.address + offset, False)}
+
+
+def _untrack(shm):
+    # stops the resource tracker from unlinking the segment at exit
+    from multiprocessing import resource_tracker
+    try:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+
+
+def _decode(filen, fields, block):
+    # worker: one granule, arrays in shared memory
+    from . import vfm_read
+    from . import vfm_expand
+
+    vfm_file = vfm_read.vfm_read(filen)
+    if vfm_file['Version'] == 3:
+        from . import vfm_type_v3 as vfm_type
+    else:
+        from . import vfm_type
+
+    vfmblock = vfm_expand.vfm_expand(vfm_file.pop('Data'))
+    arrays = {'Block':vfmblock} if block else {}
+    meta = {}
+    for tag in fields:
+        meta[tag] = vfm_type.vfm_type(vfmblock, tag)
+        arrays[tag] = meta[tag].pop('Data')
+
+    vfm_file['File'] = filen
+    vfm_file['Fields'] = meta
+    vfm_file['Shared'] = share(arrays)
+    return(vfm_file)
+
+
+def _discard(job):
+    # removes the segment of a granule decoded but not used
+    if job.cancelled():
+        return
+    try:
+        out = job.result()
+    except (Exception, SystemExit):
+        return
+    attach(out['Shared'])
+
+
+def _result(filen, job):
+    # granule of a worker, with its arrays from shared memory
+    try:
+        out = job.result()
+    except (Exception, SystemExit) as err:
+        print('Error: could not process ' + filen + ': ' + str(err))
+        return([filen, None])
+
+    arrays = attach(out.pop('Shared'))
+    for tag in out['Fields']:
+        out['Fields'][tag]['Data'] = arrays[tag]
+    if 'Block' in arrays:
+        out['Block'] = arrays['Block']
+    return([filen, out])
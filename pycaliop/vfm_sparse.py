@@ -0,0 +1,167 @@
+def vfm_sparse(vfm_file, types=[2, 3, 4], fields=[], chunk=100):
+    """VFM_SPARSE   Table of the feature pixels of a VFM granule
+
+        [sparse] = VFM_SPARSE(vfm_file) returns the pixels of the VFM
+        whose feature type is in types (default cloud, aerosol and
+        stratospheric feature, see vfm_type) as a coordinate table, one
+        entry per expanded pixel, instead of the dense 545 x (15 x ntimes)
+        block of vfm_expand. vfm_file is a dictionary as returned by
+        vfm_read, or the VFM rows (ntimes x 5515) alone.
+
+        Pixels are selected on the packed rows, chunk rows at a time, and
+        only the selected ones are expanded, so memory scales with the
+        number of features rather than with the size of the curtain.
+        sparse is a dictionary with:
+
+           'Profile', the expanded profile (column) of each pixel (int32)
+           'Level', the VFM level (row) of each pixel (int16)
+           'Word', the packed feature classification flag (uint16)
+           <field>, the flag of each field in fields (as in vfm_type)
+           'Shape', the shape of the dense block, [545, 15 x ntimes]
+           'Latitude', 'Longitude', 'Time', per profile,
+           'Altitude', per level, and 'Version', if given in vfm_file
+
+        Pixels are sorted by profile, and by level within each profile.
+        vfm_dense() turns the table back into a dense block, and
+        vfm_sparse_grid() counts the pixels on a grid. The table can
+        also be passed to vfm_colocate_index(..., pixels=sparse).
+
+        History:
+           2026-oct-19 Keeps the product version of vfm_file.
+
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+
+    if isinstance(vfm_file, dict):
+        data = vfm_file['Data']
+    else:
+        data = vfm_file
+        vfm_file = {}
+
+    [src, prof, level] = _row_layout()
+    ntimes = data.shape[0]
+    select = np.zeros(8, dtype=bool)
+    select[types] = True
+
+    parts = []
+    for i in range(0, ntimes, chunk):
+        rows = data[i:i+chunk]
+        # feature mask of the expanded pixels of each row, by profile and
+        # level, so that nonzero returns them already sorted
+        [r, k] = np.nonzero(select[np.bitwise_and(rows, np.uint16(7))][:, src])
+        parts.append([(15*(i + r) + prof[k]).astype(np.int32), level[k], rows[r, src[k]]])
+
+    sparse = {'Profile':np.concatenate([p[0] for p in parts] + [np.zeros(0, np.int32)]),
+              'Level':np.concatenate([p[1] for p in parts] + [np.zeros(0, np.int16)]),
+              'Word':np.concatenate([p[2] for p in parts] + [np.zeros(0, data.dtype)]),
+              'Shape':[545, 15*ntimes]}
+
+    for tag in fields:
+        if vfm_file.get('Version') == 3:
+            from . import vfm_type_v3 as vfm_type
+        else:
+            from . import vfm_type
+        sparse[tag] = vfm_type.vfm_type(sparse['Word'], tag)['Data']
+
+    for k in ['Latitude', 'Longitude', 'Time', 'Altitude', 'Version']:
+        if k in vfm_file:
+            sparse[k] = vfm_file[k]
+
+    return(sparse)
+
+
+def vfm_dense(sparse, field='Word', fill=0):
+    """VFM_DENSE   Dense block from a table of vfm_sparse
+
+        [block] = VFM_DENSE(sparse, field='Word', fill=0) returns the
+        field of the table (the packed flag by default, or one of the
+        decoded fields) as a 545 x profiles array, with fill where there
+        is no feature, e.g. to plot it with vfm_plot.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+
+    values = sparse[field]
+    block = np.full(sparse['Shape'], fill, dtype=values.dtype)
+    block[sparse['Level'], sparse['Profile']] = values
+
+    return(block)
+
+
+def vfm_sparse_grid(sparse, lat_edges, lon_edges, field='type', alt_edges=None):
+    """VFM_SPARSE_GRID   Counts the pixels of a table of vfm_sparse
+
+        [counts] = VFM_SPARSE_GRID(sparse, lat_edges, lon_edges) counts
+        the pixels of each value of field (a decoded field of the table,
+        by default 'type') in the cells of the lat/lon grid with these
+        edges, as the grid command of the cli does for the dense block
+        (cli.grid_counts): counts is (nval x nlat x nlon), with the
+        values of the field in vfm_type (vfm_type_v3 for V3 tables) from
+        Vmin, spare codes are not counted and pixels outside the grid
+        are counted in its edge cells.
+
+        VFM_SPARSE_GRID(..., alt_edges=edges) also splits the counts in
+        altitude layers, counts is then (nval x nalt x nlat x nlon).
+        Pixels outside the layers are not counted.
+
+        The table needs 'Latitude' and 'Longitude' (and 'Altitude' for
+        alt_edges).
+
+        History:
+           2026-oct-19 Counts with cli.grid_counts, values of the version
+                       of the table.
+
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+    from . import cli
+
+    if sparse.get('Version') == 3:
+        from . import vfm_type_v3 as vfm_type
+    else:
+        from . import vfm_type
+    meta = vfm_type.vfm_type(np.zeros(0, dtype=np.uint16), field)
+
+    if alt_edges is None:
+        layers = [np.ones(len(sparse['Profile']), dtype=bool)]
+    else:
+        alt = sparse['Altitude'][sparse['Level']]
+        layers = [(alt >= lo) & (alt < hi) for lo, hi in zip(alt_edges[:-1], alt_edges[1:])]
+        # the last edge is part of the last layer
+        layers[-1] |= alt == alt_edges[-1]
+
+    counts = []
+    for keep in layers:
+        vfms = {field: dict(meta, Data=sparse[field][keep])}
+        counts.append(cli.grid_counts(sparse['Latitude'], sparse['Longitude'], vfms,
+                                      lat_edges, lon_edges,
+                                      profile=sparse['Profile'][keep])[field])
+
+    if alt_edges is None:
+        return(counts[0])
+    return(np.stack(counts, axis=1))
+
+
+def _row_layout():
+    # for the 15 x 545 expanded pixels of a VFM row, by profile and then
+    # level: the position of their value in the row, their profile and
+    # their level. As in vfm_expand, there are 3 x 55 values for 5
+    # profiles each above 20km, 5 x 200 for 3 profiles above 8km and
+    # 15 x 290 for 1 profile below.
+    import numpy as np
+
+    [prof, level] = np.divmod(np.arange(15*545), 545)
+    src = np.select([level < 55, level < 255],
+                    [55*(prof // 5) + level, 165 + 200*(prof // 3) + level - 55],
+                    1165 + 290*prof + level - 255)
+
+    return([src, prof, level.astype(np.int16)])
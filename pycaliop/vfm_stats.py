@@ -0,0 +1,163 @@
+"""Timing and memory statistics of the processing stages
+
+Instrumentation is off by default and costs a function call per stage
+when off. Turn it on with enable() (or the PYCALIOP_STATS=1 environment
+variable), or for a block of code with
+
+    with vfm_stats.collect() as stats:
+        ...
+
+Each stage (read, expand, decode:<feature>, plot, ...) records the
+number of calls, wall and cpu time, bytes read from files and bytes of
+the arrays it allocated. Results are returned by stats(), and can be
+exported with to_json() or log_stats().
+
+History:
+   2026-oct-19 First version
+
+"""
+
+import os
+import threading
+import time
+
+_ENABLED = os.environ.get('PYCALIOP_STATS', '') not in ('', '0')
+_STATS = {}
+_LOCK = threading.Lock()
+
+
+def enable():
+    """Turns the instrumentation on"""
+    global _ENABLED
+    _ENABLED = True
+
+
+def disable():
+    """Turns the instrumentation off, keeping what was recorded"""
+    global _ENABLED
+    _ENABLED = False
+
+
+def reset():
+    """Forgets everything recorded"""
+    with _LOCK:
+        _STATS.clear()
+
+
+def start():
+    """START   Starts timing a stage
+
+        [t0] = START() returns the current wall and cpu times, to be
+        passed to stop() at the end of the stage, or None if the
+        instrumentation is off.
+
+    """
+    if not _ENABLED:
+        return(None)
+    return((time.perf_counter(), time.process_time()))
+
+
+def stop(t0, name, nbytes=0, bytes_read=0):
+    """STOP   Records a stage
+
+        STOP(t0, name, nbytes=0, bytes_read=0) adds one call of stage
+        name, started at t0 (from start()), which allocated nbytes bytes
+        of arrays and read bytes_read bytes from files. Does nothing if
+        t0 is None.
+
+    """
+    if t0 is None:
+        return
+    wall = time.perf_counter() - t0[0]
+    cpu = time.process_time() - t0[1]
+    with _LOCK:
+        s = _STATS.setdefault(name, {'calls':0, 'wall':0., 'cpu':0.,
+                                     'bytes_alloc':0, 'bytes_read':0})
+        s['calls'] += 1
+        s['wall'] += wall
+        s['cpu'] += cpu
+        s['bytes_alloc'] += int(nbytes)
+        s['bytes_read'] += int(bytes_read)
+
+
+class stage:
+    """STAGE   Context manager that records a stage
+
+        with vfm_stats.stage('grid') as st:
+            ...
+            st.nbytes += out.nbytes
+
+    records the block as stage 'grid'. nbytes and bytes_read can be
+    updated inside the block.
+
+    """
+
+    def __init__(self, name, nbytes=0, bytes_read=0):
+        self.name = name
+        self.nbytes = nbytes
+        self.bytes_read = bytes_read
+
+    def __enter__(self):
+        self.t0 = start()
+        return(self)
+
+    def __exit__(self, *exc):
+        stop(self.t0, self.name, self.nbytes, self.bytes_read)
+        return(False)
+
+
+class collect:
+    """COLLECT   Context manager that turns the instrumentation on
+
+        with vfm_stats.collect() as stats:
+            ...
+
+    resets the statistics, turns them on inside the block (and back to
+    their previous state after it), and returns in stats a dictionary
+    that is filled with the statistics when the block ends.
+
+    """
+
+    def __enter__(self):
+        self.was = _ENABLED
+        self.result = {}
+        reset()
+        enable()
+        return(self.result)
+
+    def __exit__(self, *exc):
+        if not self.was:
+            disable()
+        self.result.update(stats())
+        return(False)
+
+
+def stats():
+    """Returns a copy of the statistics, {stage: {calls, wall, cpu,
+    bytes_alloc, bytes_read}}"""
+    with _LOCK:
+        return({k: dict(v) for k, v in _STATS.items()})
+
+
+def to_json(filen=None):
+    """Returns the statistics as a JSON string, and saves it to filen
+    if given"""
+    import json
+    txt = json.dumps(stats(), indent=1, sort_keys=True)
+    if filen is not None:
+        with open(filen, 'w') as f:
+            f.write(txt)
+    return(txt)
+
+
+def log_stats(logger=None, level=None):
+    """Logs one line per stage, to the 'pycaliop' logger by default"""
+    import logging
+    if logger is None:
+        logger = logging.getLogger('pycaliop')
+    if level is None:
+        level = logging.INFO
+    for name, s in sorted(stats().items()):
+        logger.log(level, '%-20s calls %6d  wall %9.3f s  cpu %9.3f s  '
+                   'alloc %9.1f MB  read %9.1f MB', name, s['calls'], s['wall'],
+                   s['cpu'], s['bytes_alloc']/2**20, s['bytes_read']/2**20)
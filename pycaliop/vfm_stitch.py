@@ -0,0 +1,180 @@
+def vfm_stitch(files, out, fields=['type'], gap=1., jump=0.1, rows=1000):
+    """VFM_STITCH   Joins consecutive granules into one curtain on disk
+
+        [vfm_orbit] = VFM_STITCH(files, out) joins the VFM granules in
+        files (e.g. the day and night granules of an orbit, or of a day)
+        into one continuous curtain, saved as memory mapped arrays next to
+        out, so it can be plotted or analysed across granule boundaries
+        without holding it all in memory:
+
+           out_<field>.npy, the flag of each field in fields (as in
+              vfm_type), 545 levels x all profiles. 'raw' saves the
+              expanded block (uint16) instead of a decoded flag
+           out_index.npz, the profile index
+           out_fields.json, the attributes of each flag (FieldDescription,
+              Vmin, Vmax, ByteTxt, as returned by vfm_type)
+
+        Granules are ordered by the start time in their file names (see
+        vfm_read.vfm_granule_time). Profiles of a granule with a time
+        already covered by the previous one (overlap) are dropped. A gap
+        is recorded where two consecutive profiles, in the same granule
+        or across two, are more than gap seconds or jump degrees (lat or
+        lon) apart; nothing is inserted there.
+
+        The arrays are preallocated with their final size and filled
+        rows VFM rows at a time (read, vfm_expand, vfm_type), so memory
+        use does not depend on the number of granules. V3 granules are
+        decoded with vfm_type_v3; as their flags differ from V4, all
+        granules must be of the same version.
+
+        vfm_orbit is returned as by vfm_stitch_open(out).
+
+        History:
+           2026-oct-19 Gaps within granules too.
+
+           2026-oct-19 Decodes with the version of the granules, saves the
+                       attributes of the flags.
+
+           2026-oct-19 First version
+
+    """
+
+    import json
+    import os
+    import sys
+    import numpy as np
+    from . import vfm_read
+    from . import vfm_expand
+
+    if len(files) == 0:
+        sys.exit('No VFM files to stitch.')
+    t0 = {f: vfm_read.vfm_granule_time(f) for f in files}
+    files = sorted(files, key=lambda f: (t0[f] is None, str(t0[f]), f))
+    coords = [vfm_read.vfm_read(filen, data=False) for filen in files]
+    versions = sorted(set(c['Version'] for c in coords))
+    if len(versions) > 1:
+        sys.exit('Granules of versions ' + str(versions) + ' have different flags, '
+                 'stitch each version separately.')
+    if versions[0] == 3:
+        from . import vfm_type_v3 as vfm_type
+    else:
+        from . import vfm_type
+
+    # profiles of each granule kept
+    skip = np.zeros(len(files), dtype=np.int64)
+    last = None
+    for k, c in enumerate(coords):
+        if last is not None:
+            skip[k] = np.searchsorted(c['Time'], last, side='right')
+        if skip[k] < len(c['Time']):
+            last = c['Time'][-1]
+    nt = sum(len(c['Time']) - s for c, s in zip(coords, skip))
+
+    start = np.cumsum(np.concatenate([[0], [len(c['Time']) - s for c, s in zip(coords, skip)]]))
+    nz = len(coords[0]['Altitude'])
+
+    index = {'Latitude':np.concatenate([c['Latitude'][s:] for c, s in zip(coords, skip)]),
+             'Longitude':np.concatenate([c['Longitude'][s:] for c, s in zip(coords, skip)]),
+             'Time':np.concatenate([c['Time'][s:] for c, s in zip(coords, skip)]),
+             'Granule':np.repeat(np.arange(len(files)), np.diff(start)),
+             'Altitude':coords[0]['Altitude'],
+             'Files':np.array(files), 'Start':start[:-1], 'Skip':skip,
+             'Version':versions[0]}
+    # gaps between any two consecutive profiles, within granules too
+    dlon = np.abs((np.diff(index['Longitude']) + 180.) % 360. - 180.)
+    index['Gaps'] = np.flatnonzero((np.diff(index['Time']) > gap) |
+                                   (np.abs(np.diff(index['Latitude'])) > jump) |
+                                   (dlon > jump)).astype(np.int64) + 1
+
+    # attributes and data type of each flag, from an empty block
+    meta = {}
+    for tag in fields:
+        if tag == 'raw':
+            meta[tag] = {'FieldDescription':'Feature Classification Flags',
+                         'Data':np.zeros(0, dtype=np.uint16)}
+        else:
+            meta[tag] = vfm_type.vfm_type(np.zeros((0, 0), dtype=np.uint16), tag)
+
+    # preallocated, on disk
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    arrays = {}
+    for tag in fields:
+        arrays[tag] = np.lib.format.open_memmap(out + '_' + tag + '.npy', mode='w+',
+                                                dtype=meta[tag].pop('Data').dtype,
+                                                shape=(nz, int(nt)))
+
+    for k, (filen, c) in enumerate(zip(files, coords)):
+        # first row with a profile kept, and profiles to drop in it
+        r0, drop = divmod(int(skip[k]), 15)
+        col = start[k]
+        for r in range(r0, c['Rows'], rows):
+            block = vfm_expand.vfm_expand(vfm_read.vfm_read_rows(filen, r, r + rows))
+            if r == r0:
+                block = block[:, drop:]
+            for tag in fields:
+                if tag == 'raw':
+                    arrays[tag][:, col:col+block.shape[1]] = block
+                else:
+                    arrays[tag][:, col:col+block.shape[1]] = \
+                        vfm_type.vfm_type(block, tag)['Data']
+            col += block.shape[1]
+
+    for tag in fields:
+        arrays[tag].flush()
+    np.savez(out + '_index.npz', **index)
+    with open(out + '_fields.json', 'w') as f:
+        json.dump(meta, f)
+
+    return(vfm_stitch_open(out, fields))
+
+
+def vfm_stitch_open(out, fields=None):
+    """VFM_STITCH_OPEN   Opens a curtain saved by vfm_stitch
+
+        [vfm_orbit] = VFM_STITCH_OPEN(out) returns a dictionary with the
+        flags saved by vfm_stitch(files, out), one per field, and the
+        profile index. Each flag is a dictionary as returned by vfm_type,
+        whose 'Data' is a read-only memory mapped array (545 x profiles),
+        so it can be passed to vfm_plot as it is:
+
+            vfm_plot.vfm_plot(vfm_orbit['type'], xs, vfm_orbit['Altitude'],
+                              version=vfm_orbit['Version'])
+
+        The profile index has:
+
+           'Latitude', 'Longitude', 'Time', per profile
+           'Granule', index in 'Files' of the granule of each profile
+           'Altitude', the VFM levels (km)
+           'Files', the granules, in order
+           'Start', first profile of each granule in the curtain
+           'Skip', profiles of each granule dropped as overlap
+           'Gaps', profiles with a gap before them
+           'Version', the product version of the granules
+
+        fields limits the flags opened, by default all those found.
+
+        History:
+           2026-oct-19 Flags with their attributes, as vfm_type.
+
+           2026-oct-19 First version
+
+    """
+
+    import glob
+    import json
+    import os
+    import numpy as np
+
+    if fields is None:
+        n = len(os.path.basename(out)) + 1
+        fields = [os.path.basename(f)[n:-4] for f in sorted(glob.glob(glob.escape(out) + '_*.npy'))]
+
+    with np.load(out + '_index.npz') as index:
+        vfm_orbit = {k: index[k] for k in index.files}
+    vfm_orbit['Version'] = int(vfm_orbit['Version'])
+    with open(out + '_fields.json') as f:
+        meta = json.load(f)
+    for tag in fields:
+        vfm_orbit[tag] = dict(meta[tag], Data=np.load(out + '_' + tag + '.npy', mmap_mode='r'))
+
+    return(vfm_orbit)
@@ -0,0 +1,129 @@
+def vfm_synthetic(ntimes, seed=0):
+    """VFM_SYNTHETIC   Creates a synthetic VFM granule
+
+        [vfm_file] = VFM_SYNTHETIC(ntimes) returns a granule with ntimes
+        VFM rows (15 x ntimes profiles) in the same format returned by
+        vfm_read(), to test and benchmark the code without real files:
+
+           'Data', the Feature_Classification_Flags (ntimes x 5515, uint16)
+           'Latitude', 'Longitude', 'Time', one per expanded profile
+           'Altitude', the 545 VFM levels (km)
+           'Rows', ntimes
+           'Version', always 4
+
+        The curtain has a varying surface with subsurface below it,
+        aerosol layers in the boundary layer, cloud layers (some opaque,
+        with no signal below them), and a few stratospheric features.
+        All bit fields (type, QA, phase, sub-type, averaging) have valid
+        values for the feature type. The rows are packed as in the real
+        files, so the high altitude data is shared by 3 or 5 profiles.
+        seed makes the granule reproducible.
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    nt = 15*ntimes
+    alt = vfm_altitude()
+    nz = len(alt)
+
+    # smooth surface, 0-2 km
+    walk = np.cumsum(rng.normal(0., 0.02, nt))
+    surf = 1. + np.clip(walk - np.mean(walk), -1., 1.)
+    ftype = np.ones((nz, nt), dtype=np.uint16)
+    below = alt[:, None] < surf[None, :]
+    ftype[below] = 6
+    # surface is the first level below the surface altitude
+    isurf = np.argmax(below, axis=0)
+    ftype[isurf, np.arange(nt)] = 5
+
+    def layers(n, ztop, thick, length, value):
+        top = rng.uniform(ztop[0], ztop[1], n)
+        base = top - rng.uniform(thick[0], thick[1], n)
+        start = rng.integers(0, nt, n)
+        end = np.minimum(start + rng.integers(length[0], length[1], n), nt)
+        return([(t, b, s, e, value) for t, b, s, e in zip(top, base, start, end)])
+
+    # one layer of each kind every few hundred profiles
+    nlay = max(nt // 300, 1)
+    lay = (layers(nlay, [1., 4.], [0.3, 2.], [30, 600], 3) +
+           layers(2*nlay, [2., 16.], [0.2, 3.], [15, 900], 2) +
+           layers(max(nlay // 10, 1), [16., 25.], [0.5, 3.], [100, 1500], 4))
+    opaque = rng.uniform(size=len(lay)) < 0.3
+
+    for (top, base, start, end, value), opq in zip(lay, opaque):
+        levels = np.flatnonzero((alt <= top) & (alt >= base))
+        if len(levels) == 0:
+            continue
+        block = ftype[levels[0]:levels[-1]+1, start:end]
+        block[block == 1] = value
+        if opq & (value == 2):
+            # totally attenuated below opaque clouds, down to the surface
+            sub = ftype[levels[-1]+1:, start:end]
+            sub[(sub == 1) | (sub == 3) | (sub == 5) | (sub == 6)] = 7
+
+    # other bit fields, consistent with the feature type
+    feature = (ftype >= 2) & (ftype <= 4)
+    cloud = (ftype == 2)
+    qa = np.where(feature, rng.integers(1, 4, (nz, nt)), 0)
+    phase = np.where(cloud, rng.integers(1, 4, (nz, nt)), 0)
+    phaseqa = np.where(cloud, rng.integers(1, 4, (nz, nt)), 0)
+    subtype = np.where(feature, rng.integers(0, 8, (nz, nt)), 0)
+    subtype = np.where(ftype == 4, rng.integers(1, 5, (nz, nt)), subtype)
+    subqa = np.where(feature, rng.integers(0, 2, (nz, nt)), 0)
+    avg = np.where(feature, rng.integers(1, 6, (nz, nt)), 0)
+
+    block = (ftype
+             | np.uint16(qa) << 3
+             | np.uint16(phase) << 5
+             | np.uint16(phaseqa) << 7
+             | np.uint16(subtype) << 9
+             | np.uint16(subqa) << 12
+             | np.uint16(avg) << 13).astype(np.uint16)
+
+    # pack as in the files: 3 profiles above 20km, 5 between 8 and 20km
+    # and 15 below 8km, per row
+    block = block.reshape(nz, ntimes, 15)
+    top = block[:55, :, ::5].transpose(1, 2, 0).reshape(ntimes, 165)
+    mid = block[55:255, :, ::3].transpose(1, 2, 0).reshape(ntimes, 1000)
+    low = block[255:, :, :].transpose(1, 2, 0).reshape(ntimes, 4350)
+    data = np.ascontiguousarray(np.concatenate([top, mid, low], axis=1))
+
+    # descending along track, 333m (0.003 deg) per profile
+    k = np.arange(nt)
+    lat = 60. - 0.003*k
+    lon = -50. - 0.0008*k
+    time = 642015482. + 0.04757*k
+
+    vfm_file = {'Data':data,
+                'Latitude':lat, 'Longitude':lon, 'Time':time,
+                'Altitude':alt,
+                'Rows':ntimes,
+                'Version':4}
+
+    return(vfm_file)
+
+
+def vfm_altitude():
+    """VFM_ALTITUDE   Altitudes of the VFM levels
+
+        [alt] = VFM_ALTITUDE() returns the altitude (km) of the center of
+        the 545 VFM levels, from the top: 55 levels of 180m above 20.2km,
+        200 levels of 60m above 8.2km and 290 levels of 30m below. These
+        are the Lidar_Data_Altitudes of the files, between -0.5 and 30km.
+        Same as vfm_levels.vfm_altitude.
+
+        History:
+           2026-oct-19 Defined in vfm_levels.
+
+           2026-oct-19 First version
+
+    """
+
+    from . import vfm_levels
+
+    return(vfm_levels.vfm_altitude())
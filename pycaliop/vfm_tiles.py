@@ -0,0 +1,104 @@
+def vfm_tiles(outdir, vfm, tile=256, version=4, compress=6, chunk=65536):
+    """VFM_TILES   Builds a tile pyramid of a VFM feature
+
+        [info] = VFM_TILES(outdir, vfm) saves the feature flag in vfm (as
+        returned by vfm_type) as a pyramid of tile x tile (default 256)
+        palette PNG images, to be used by a viewer that pans and zooms
+        along the track. vfm can also be a list of features of
+        consecutive granules, which are joined along the track.
+
+        Tiles are saved as outdir/level/x/y.png, with level 0 the
+        coarsest (the whole curtain in a single tile) and the last level
+        the full resolution, one pixel per level and expanded profile. x
+        counts tiles along the track and y from the top. Each level is
+        built from the one below by merging 2 x 2 pixels with
+        vfm_decimate.vfm_reduce, so thin features are kept and nothing is
+        rendered twice. Tiles at the end of the curtain are padded with
+        white.
+
+        Colors are those of vfm_plot (version=3 uses the V3 colors), and
+        compress is the zlib compression level. The reduction is done
+        chunk profiles at a time, to limit the memory used.
+
+        info is a dictionary describing the pyramid, also saved as
+        outdir/tiles.json:
+
+           'FieldDescription', 'Vmin', 'Vmax', 'ByteTxt', as in vfm
+           'TileSize', size of the tiles
+           'Levels', number of levels
+           'Shape', [rows, columns] of the image at each level
+           'Palette', the RGB colors, the last one is for no data
+
+        History:
+           2026-oct-19 First version
+
+    """
+
+    import os
+    import json
+    import numpy as np
+    from . import CreateColorMap
+    from . import vfm_png
+
+    if isinstance(vfm, (list, tuple)):
+        vfm_all = dict(vfm[0])
+        vfm_all['Data'] = np.concatenate([v['Data'] for v in vfm], axis=1)
+        vfm = vfm_all
+
+    vmin, vmax = vfm['Vmin'], vfm['Vmax']
+    lut = CreateColorMap.ColorMapLUT(vfm['FieldDescription'], vmin, vmax, version=version)
+    white = len(lut)
+    palette = np.concatenate([lut, [[255, 255, 255]]]).astype(np.uint8)
+
+    [nz, nt] = vfm['Data'].shape
+    nlev = 1 + int(np.ceil(np.log2(max(nt/tile, nz/tile, 1))))
+
+    info = {'FieldDescription':vfm['FieldDescription'],
+            'Vmin':vmin, 'Vmax':vmax, 'ByteTxt':list(vfm['ByteTxt']),
+            'TileSize':tile, 'Levels':nlev, 'Shape':[None]*nlev,
+            'Palette':palette.tolist()}
+
+    # from the finest to the coarsest level
+    level = vfm
+    for z in range(nlev-1, -1, -1):
+        if z < nlev-1:
+            level = _halve(level, chunk)
+
+        [nz, nt] = level['Data'].shape
+        info['Shape'][z] = [nz, nt]
+        for x in range(int(np.ceil(nt/tile))):
+            # one column of tiles
+            cols = np.uint8(np.clip(level['Data'][:, x*tile:(x+1)*tile], vmin, vmax) - vmin)
+            os.makedirs(os.path.join(outdir, str(z), str(x)), exist_ok=True)
+            for y in range(int(np.ceil(nz/tile))):
+                img = np.full((tile, tile), white, dtype=np.uint8)
+                part = cols[y*tile:(y+1)*tile, :]
+                img[:part.shape[0], :part.shape[1]] = part
+                vfm_png.png_write(os.path.join(outdir, str(z), str(x), '%d.png'%y),
+                                  img, palette, compress=compress)
+
+    with open(os.path.join(outdir, 'tiles.json'), 'w') as f:
+        json.dump(info, f)
+
+    return(info)
+
+
+def _halve(vfm, chunk):
+    # merges 2 x 2 pixels, chunk profiles (an even number) at a time
+    import numpy as np
+    from . import vfm_decimate
+
+    chunk = chunk + (chunk % 2)
+    [nz, nt] = vfm['Data'].shape
+    rstart = np.arange(0, nz, 2)
+
+    parts = []
+    for i in range(0, nt, chunk):
+        part = dict(vfm)
+        part['Data'] = np.asarray(vfm['Data'][:, i:i+chunk])
+        cstart = np.arange(0, part['Data'].shape[1], 2)
+        parts.append(vfm_decimate.vfm_reduce(part, rstart, cstart))
+
+    out = dict(vfm)
+    out['Data'] = np.concatenate(parts, axis=1)
+    return(out)
@@ -26,6 +26,10 @@ def vfm_type(vfm_row, feature):
            'ByteTxt', descriptors of the feature flag
         
         History: 
+           2026-oct-19 No longer prints the aerosol types found.
+
+           2026-oct-19 Records its time in vfm_stats (stage 'decode:<feature>').
+
            2021-may-24 Translated from Matlab to Python
 
            2021-apr-20 Returns data and metadata in the same object.
@@ -40,7 +44,10 @@ def vfm_type(vfm_row, feature):
 
     import numpy as np
     import sys
-    
+    from . import vfm_stats
+
+    t0 = vfm_stats.start()
+
     umask3 = np.uint16(7)
     umask2 = np.uint16(3)
     umask1 = np.uint16(1)
@@ -123,7 +130,6 @@ def vfm_type(vfm_row, feature):
         # 7 = other
         a = np.right_shift(vfm_row,9)
         vfm_flag = np.int16(np.bitwise_and(umask3,a))
-        print(np.unique(vfm_flag))
         # mark regions where there are no aerosols
         vfm_feature = np.bitwise_and(umask3,vfm_row)
         vfm_flag[vfm_feature != 3] = -1
@@ -229,5 +235,7 @@ def vfm_type(vfm_row, feature):
                      'FieldDescription':'empty',
                      'Vmin':np.nan, 'Vmax':np.nan,
                      'ByteTxt':['empty']}
-    
+
+    vfm_stats.stop(t0, 'decode:' + feature, nbytes=vfm_class['Data'].nbytes)
+
     return (vfm_class)
@@ -26,6 +26,8 @@ def vfm_type(vfm_row, feature):
            'ByteTxt', descriptors of the feature flag
         
         History: 
+           2026-oct-19 Records its time in vfm_stats (stage 'decode:<feature>').
+
            2021-may-24 Translated from Matlab to Python
 
            2021-apr-20 Returns data and metadata in the same object.
@@ -40,6 +42,9 @@ def vfm_type(vfm_row, feature):
 
     import numpy as np
     import sys
+    from . import vfm_stats
+
+    t0 = vfm_stats.start()
     
     umask3 = np.uint16(7)
     umask2 = np.uint16(3)
@@ -219,5 +224,7 @@ def vfm_type(vfm_row, feature):
                      'FieldDescription':'empty',
                      'Vmin':np.nan, 'Vmax':np.nan,
                      'ByteTxt':['empty']}
+
+    vfm_stats.stop(t0, 'decode:' + feature, nbytes=vfm_class['Data'].nbytes)
     
     return (vfm_class)